@@ -0,0 +1,202 @@
+import queue
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+import synthetic
+from model_router import bundle_frame
+
+# Chat messages the precomputed advice answers; anything else goes through the FAQ / LLM path
+ADVICE_REQUEST = re.compile(r"""\b(?:
+    advice | advise | recommend\w* | suggest\w* | tips? | next\W+steps? | help\W+me |
+    what\W+(?:should|can|do|must)\W+i\W+(?:do|change|try) | what\W+now |
+    how\W+(?:can|do|should|could)\W+i\W+(?:improve|lower|reduce|fix|change|get\W+better)
+)\b""", re.X)
+
+
+def asks_for_advice(text):
+    return ADVICE_REQUEST.search(text.lower()) is not None
+
+
+def baseline_values(bundle, n=5000, seed=0):
+    """Typical value per feature: median / most common category from the bundle's reference profile.
+
+    Bundles without a stored profile fall back to a sample from the training generator.
+    """
+    columns = bundle['categorical_features'] + bundle['numeric_features']
+    profile = (bundle.get('reference_profile') or {}).get('columns', {})
+    if all(name in profile for name in columns):
+        baseline = {}
+        for name in columns:
+            col = profile[name]
+            if col['type'] == 'numeric':
+                baseline[name] = col['quantiles']['p50'] if col.get('count') else None
+            else:
+                baseline[name] = next(iter(col['top']), None)
+        return baseline
+    data = synthetic.generate(n, np.random.RandomState(seed))
+    return {name: (data[name].mode()[0] if name in bundle['categorical_features'] else float(data[name].median()))
+            for name in columns if name in data}
+
+
+def risk_drivers(bundle, row, baseline, n=3, min_effect=0.01):
+    """Fields whose move to the typical value lowers the risk most, as (field, description) pairs.
+
+    Numeric drivers are described only by direction ("above typical") so that
+    users with similar profiles share a driver key and therefore an advice text.
+    """
+    fields = [f for f, typical in baseline.items()
+              if typical is not None and row.get(f) is not None and row[f] != typical]
+    if not fields:
+        return ()
+    rows = [row] + [dict(row, **{f: baseline[f]}) for f in fields]
+    prob = bundle['pipeline'].predict_proba(bundle_frame(bundle, rows))[:, 1]
+    effects = prob[0] - prob[1:]
+    drivers = []
+    for i in np.argsort(-effects)[:n]:
+        if effects[i] < min_effect:
+            break
+        field = fields[i]
+        if field in bundle['categorical_features']:
+            drivers.append((field, str(row[field])))
+        else:
+            drivers.append((field, 'above typical' if row[field] > baseline[field] else 'below typical'))
+    return tuple(drivers)
+
+
+class AdvicePrecomputer:
+    """Generates chat advice in the background right after a prediction.
+
+    `submit` only enqueues; worker threads find the prediction's top risk drivers
+    and call `generate(high_risk, drivers)` (the LLM) once per distinct driver
+    profile, so users with identical drivers share one cached answer. The result
+    is attached to the session as a Future that the chat's first message takes.
+    """
+
+    def __init__(self, generate, workers=2, max_entries=2000, max_sessions=10000, queue_size=256):
+        self.generate = generate
+        self.max_entries = max_entries
+        self.max_sessions = max_sessions
+        self._advice = OrderedDict()
+        self._pending = {}
+        self._sessions = OrderedDict()
+        self._baselines = {}
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.generated = 0
+        self.deduplicated = 0
+        self.failed = 0
+        self.dropped = 0
+        self.served = 0
+        self.misses = 0
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f'advice-{i}', daemon=True).start()
+
+    def submit(self, session, bundle, row, prob):
+        future = Future()
+        try:
+            self._queue.put_nowait((future, bundle, row, prob))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                # Whatever was pending belongs to an earlier prediction
+                self._sessions.pop(session, None)
+            return
+        with self._lock:
+            self.submitted += 1
+            self._sessions[session] = future
+            self._sessions.move_to_end(session)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def discard(self, session):
+        """Forget the session's pending advice, e.g. after a new prediction that is not precomputed."""
+        with self._lock:
+            self._sessions.pop(session, None)
+
+    def take(self, session, timeout=10.0):
+        """Advice for the session's last prediction, waiting up to `timeout` if it is still being generated.
+
+        The entry is removed, so only the first chat message after a prediction uses it.
+        """
+        with self._lock:
+            future = self._sessions.pop(session, None)
+        if future is None:
+            return None
+        try:
+            advice = future.result(timeout=timeout)
+        except Exception:
+            # Still generating after `timeout` (TimeoutError) or generation failed
+            advice = None
+        with self._lock:
+            if advice is None:
+                self.misses += 1
+            else:
+                self.served += 1
+        return advice
+
+    def _baseline(self, bundle):
+        version = bundle.get('model_version')
+        baseline = self._baselines.get(version)
+        if baseline is None:
+            baseline = self._baselines[version] = baseline_values(bundle)
+        return baseline
+
+    def _worker(self):
+        while True:
+            future, bundle, row, prob = self._queue.get()
+            try:
+                key = (bool(prob > 0.5), risk_drivers(bundle, row, self._baseline(bundle)))
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            with self._lock:
+                if key in self._advice:
+                    self._advice.move_to_end(key)
+                    self.deduplicated += 1
+                    future.set_result(self._advice[key])
+                    continue
+                waiters = self._pending.get(key)
+                if waiters is not None:
+                    # The same driver profile is already being generated; share its answer
+                    self.deduplicated += 1
+                    waiters.append(future)
+                    continue
+                waiters = self._pending[key] = [future]
+            advice, error = None, None
+            try:
+                advice = self.generate(*key)
+            except Exception as e:
+                error = e
+            with self._lock:
+                del self._pending[key]
+                if advice:
+                    self.generated += 1
+                    self._advice[key] = advice
+                    while len(self._advice) > self.max_entries:
+                        self._advice.popitem(last=False)
+                else:
+                    self.failed += 1
+            for waiter in waiters:
+                if advice:
+                    waiter.set_result(advice)
+                else:
+                    waiter.set_exception(error or ValueError('no advice generated'))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'submitted': self.submitted,
+                'generated': self.generated,
+                'deduplicated': self.deduplicated,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'served_from_cache': self.served,
+                'cache_misses': self.misses,
+                'cached_profiles': len(self._advice),
+                'queued': self._queue.qsize(),
+            }
@@ -0,0 +1,175 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+
+from population import age_band
+
+DEFAULT_DIMENSIONS = ['age_band', 'gender', 'physical_activity']
+ALL = '_all'
+
+
+def _new_cell():
+    return [0, 0, 0.0]
+
+
+def _merge(into, cells):
+    for dim, values in cells.items():
+        target = into.setdefault(dim, {})
+        for value, (count, high, prob_sum) in values.items():
+            cell = target.setdefault(value, _new_cell())
+            cell[0] += count
+            cell[1] += high
+            cell[2] += prob_sum
+
+
+def _rollup(cells):
+    return {
+        dim: {value: {'count': count, 'high_risk': high, 'high_risk_rate': high / count if count else None,
+                      'mean_probability': prob_sum / count if count else None}
+              for value, (count, high, prob_sum) in sorted(values.items())}
+        for dim, values in cells.items()
+    }
+
+
+class AggregateStore:
+    """Prediction counts, high-risk tallies and probability sums per dimension value.
+
+    Each recorded prediction updates one cell per dimension (plus an overall cell)
+    in the all-time table and in its time bucket, so recording is O(1) and rollups
+    read precomputed cells instead of scanning history. Time buckets older than
+    `retention` buckets are dropped. A background thread checkpoints the tables to
+    `path` every `checkpoint_interval` seconds when they changed, and they are
+    reloaded from there on start.
+    """
+
+    def __init__(self, path, dimensions=DEFAULT_DIMENSIONS, bucket_seconds=3600, retention=24 * 30,
+                 checkpoint_interval=60, max_values=50):
+        self.path = path
+        self.dimensions = list(dimensions)
+        self.bucket_seconds = bucket_seconds
+        self.retention = retention
+        self.checkpoint_interval = checkpoint_interval
+        self.max_values = max_values
+        self._total = {}
+        self._buckets = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+        threading.Thread(target=self._checkpoint_loop, name='aggregate-checkpoint', daemon=True).start()
+        atexit.register(self.checkpoint)
+
+    def _value(self, dim, row):
+        if dim == 'age_band':
+            return age_band(row['age']) if row.get('age') is not None else 'unknown'
+        value = row.get(dim)
+        return 'unknown' if value in (None, '') else str(value)
+
+    def record(self, row, probability, high, ts=None):
+        bucket = int((ts or time.time()) // self.bucket_seconds)
+        keys = [(ALL, ALL)] + [(dim, self._value(dim, row)) for dim in self.dimensions]
+        high, probability = int(bool(high)), float(probability)
+        with self._lock:
+            cells = self._buckets.get(bucket)
+            if cells is None:
+                cells = self._buckets[bucket] = {}
+                self._expire(bucket)
+            for table in (self._total, cells):
+                for dim, value in keys:
+                    values = table.setdefault(dim, {})
+                    cell = values.get(value)
+                    if cell is None:
+                        # Cap distinct values so a high-cardinality dimension cannot grow unbounded
+                        if len(values) >= self.max_values:
+                            value = 'other'
+                        cell = values.setdefault(value, _new_cell())
+                    cell[0] += 1
+                    cell[1] += high
+                    cell[2] += probability
+            self._dirty = True
+
+    def _expire(self, newest):
+        for bucket in [b for b in self._buckets if b <= newest - self.retention]:
+            del self._buckets[bucket]
+
+    def query(self, dimension=None, start=None, end=None):
+        """Rollup per dimension value, all-time or over the buckets overlapping [start, end]."""
+        with self._lock:
+            if start is None and end is None:
+                cells = {dim: {v: list(c) for v, c in values.items()} for dim, values in self._total.items()}
+                buckets = None
+            else:
+                lo = int(start // self.bucket_seconds) if start is not None else None
+                hi = int(end // self.bucket_seconds) if end is not None else None
+                cells = {}
+                buckets = 0
+                for bucket, table in self._buckets.items():
+                    if (lo is None or bucket >= lo) and (hi is None or bucket <= hi):
+                        _merge(cells, table)
+                        buckets += 1
+        if dimension is not None:
+            if dimension not in self.dimensions:
+                raise ValueError(f"unknown dimension {dimension!r}; configured: {self.dimensions}")
+            cells = {dim: cells.get(dim, {}) for dim in (ALL, dimension)}
+        rollup = _rollup(cells)
+        overall = rollup.pop(ALL, {}).get(ALL, {'count': 0})
+        out = {'overall': overall, 'dimensions': rollup, 'bucket_seconds': self.bucket_seconds}
+        if buckets is not None:
+            out['buckets'] = buckets
+        return out
+
+    def series(self, dimension, value, start=None, end=None):
+        """Per-bucket count and high-risk rate for one dimension value (or ALL)."""
+        with self._lock:
+            points = []
+            for bucket in sorted(self._buckets):
+                ts = bucket * self.bucket_seconds
+                if (start is not None and ts + self.bucket_seconds <= start) or (end is not None and ts > end):
+                    continue
+                cell = self._buckets[bucket].get(dimension, {}).get(value)
+                if cell:
+                    points.append({'ts': ts, 'count': cell[0], 'high_risk_rate': cell[1] / cell[0],
+                                   'mean_probability': cell[2] / cell[0]})
+        return points
+
+    def checkpoint(self):
+        with self._lock:
+            if not self._dirty:
+                return False
+            state = {
+                'dimensions': self.dimensions,
+                'bucket_seconds': self.bucket_seconds,
+                'total': self._total,
+                'buckets': {str(b): table for b, table in self._buckets.items()},
+            }
+            payload = json.dumps(state)
+            self._dirty = False
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or '.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(payload)
+        os.replace(tmp, self.path)
+        return True
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path) as f:
+            state = json.load(f)
+        if state.get('bucket_seconds') != self.bucket_seconds:
+            # Buckets of a different width cannot be mapped; keep only the all-time table
+            state['buckets'] = {}
+        dims = set(self.dimensions) | {ALL}
+        self._total = {dim: values for dim, values in state.get('total', {}).items() if dim in dims}
+        self._buckets = {int(b): {dim: values for dim, values in table.items() if dim in dims}
+                         for b, table in state.get('buckets', {}).items()}
+
+    def _checkpoint_loop(self):
+        while True:
+            time.sleep(self.checkpoint_interval)
+            try:
+                self.checkpoint()
+            except OSError:
+                pass
@@ -1,20 +1,228 @@
-from flask import Flask, request, render_template, jsonify
-import joblib
-import numpy as np
+import hmac
 import os
+import threading
+import time
+import uuid
 
-try:
-    from openai import OpenAI
-except Exception:
-    OpenAI = None
+from startup import StartupProfile
+
+# STARTUP_PROFILE=1 prints how long each import and startup phase took
+startup = StartupProfile(enabled=os.environ.get('STARTUP_PROFILE') == '1')
+startup.start_import_timing()
+
+with startup.step('imports'):
+    from flask import Flask, request, render_template, jsonify, g, Response
+    from werkzeug.exceptions import RequestEntityTooLarge
+    import joblib
+
+    from drift import DriftMonitor
+    from model_router import ModelRouter, bundle_frame
+    from multihead import HEAD_TITLES
+    from delta_scoring import SessionScorer
+    from percentiles import risk_percentile
+    from schema import RowValidator, build_schema
+    from history_store import HistoryStore
+    from aggregates import AggregateStore, DEFAULT_DIMENSIONS
+    from what_if import build_grid
+    from population import PopulationSimulator
+    from bulk_jobs import JobManager, JobQueueFull
+    from tracing import JsonlSink, Tracer, span
+    from faq_responder import FaqIndex, red_flag
+    from advice import AdvicePrecomputer, asks_for_advice
+    from tenant_models import TenantModels, UnknownTenant
+    from online_learning import OnlineLearner, parse_label
+    import profiler
+
+startup.stop_import_timing()
+
+# The OpenAI SDK is imported on the first chat request; see get_openai_client()
+_openai_client = None
+_openai_lock = threading.Lock()
+
+# System prompt tailored for health guidance disclaimers
+HEALTHBOT_PROMPT = (
+    "You are HealthBot, a helpful assistant for general wellness and education. "
+    "Provide clear, empathetic, evidence-informed guidance. Do not offer diagnoses. "
+    "Add a brief disclaimer to consult a medical professional for personal medical advice."
+)
 
 app = Flask(__name__)
 
-model_bundle = joblib.load('model/model.pkl')
+# Request traces: TRACE_SAMPLE_RATE of requests plus every request slower than TRACE_SLOW_MS
+tracer = Tracer(
+    JsonlSink(os.environ.get('TRACE_PATH', 'logs/traces.jsonl')),
+    sample_rate=float(os.environ.get('TRACE_SAMPLE_RATE', '0.01')),
+    slow_ms=float(os.environ.get('TRACE_SLOW_MS', '500')),
+)
+
+@app.before_request
+def start_trace():
+    g.trace_tokens = tracer.start(request.endpoint or request.path, method=request.method)
+
+@app.after_request
+def record_status(response):
+    g.trace_status = response.status_code
+    return response
+
+@app.teardown_request
+def finish_trace(exc):
+    tokens = g.pop('trace_tokens', None)
+    if tokens is not None:
+        tracer.finish(tokens, status=g.pop('trace_status', 500), error=repr(exc) if exc else None)
+
+MODEL_PATH = 'model/model.pkl'
+
+with startup.step('load model bundle'):
+    model_bundle = joblib.load(MODEL_PATH)
 pipeline = model_bundle['pipeline']
 categorical_features = model_bundle['categorical_features']
 numeric_features = model_bundle['numeric_features']
 
+# Optional candidate model evaluated next to the primary on live traffic:
+#   CANDIDATE_MODEL_PATH=model/candidate.pkl CANDIDATE_MODE=shadow|split CANDIDATE_TRAFFIC=10
+candidate_path = os.environ.get('CANDIDATE_MODEL_PATH')
+with startup.step('load candidate bundle'):
+    router = ModelRouter(
+        model_bundle,
+        candidate=joblib.load(candidate_path) if candidate_path else None,
+        mode=os.environ.get('CANDIDATE_MODE', 'shadow'),
+        traffic=float(os.environ.get('CANDIDATE_TRAFFIC', '0')),
+        # Repeat submissions in a session re-score only the changed fields (linear bundles only)
+        sessions=SessionScorer() if os.environ.get('DELTA_SCORING', '1') == '1' else None,
+    )
+
+simulator = PopulationSimulator(model_bundle, model_path=MODEL_PATH,
+                                max_workers=int(os.environ.get('SIMULATION_WORKERS', '0')) or None)
+
+# Bulk CSV scoring jobs run on their own small process pool; results expire after BULK_RESULT_TTL seconds.
+# Job state is per process: status, results and cancel requests must reach the process that took the upload
+bulk_jobs = JobManager(
+    MODEL_PATH,
+    job_dir=os.environ.get('BULK_JOB_DIR', 'data/jobs'),
+    max_workers=int(os.environ.get('BULK_WORKERS', '2')),
+    max_jobs=int(os.environ.get('BULK_MAX_JOBS', '8')),
+    ttl=float(os.environ.get('BULK_RESULT_TTL', '3600')),
+)
+# Largest accepted request body (bulk uploads included), checked before anything is written to disk
+BULK_MAX_UPLOAD_BYTES = int(float(os.environ.get('BULK_MAX_UPLOAD_MB', '200')) * (1 << 20))
+app.config['MAX_CONTENT_LENGTH'] = BULK_MAX_UPLOAD_BYTES
+
+# Per-clinic bundles in TENANT_MODEL_DIR/<tenant>/model.pkl, selected by the X-Tenant-Id header and kept
+# in an LRU bounded to TENANT_CACHE_MB of bundles
+tenants = None
+if os.environ.get('TENANT_MODEL_DIR'):
+    tenants = TenantModels(
+        os.environ['TENANT_MODEL_DIR'],
+        max_bytes=int(float(os.environ.get('TENANT_CACHE_MB', '1024')) * (1 << 20)),
+        refresh_interval=float(os.environ.get('TENANT_REFRESH_SECONDS', '30')),
+    )
+
+# Curated FAQ answers served before calling the LLM (build with: python faq_responder.py build)
+with startup.step('load faq index'):
+    try:
+        faq_index = FaqIndex(threshold=float(os.environ.get('FAQ_THRESHOLD', '0.6')))
+    except FileNotFoundError:
+        faq_index = None
+
+# Clinician feedback is appended to FEEDBACK_PATH and, unless ONLINE_LEARNING=0, fed to a background
+# learner that swaps an updated primary model in when it does not regress on held-out feedback
+feedback_log = JsonlSink(os.environ.get('FEEDBACK_PATH', 'data/feedback.jsonl'))
+learner = None
+if os.environ.get('ONLINE_LEARNING', '1') == '1':
+    try:
+        learner = OnlineLearner(model_bundle, publish=lambda bundle: router.swap('primary', bundle))
+    except ValueError as e:
+        app.logger.info('online learning disabled: %s', e)
+
+def generate_advice(high_risk, drivers):
+    """LLM advice for a risk result and its top drivers; carries no other user data."""
+    client = get_openai_client(os.environ.get('OPENAI_API_KEY'))
+    if client is None:
+        return None
+    factors = '; '.join(f"{field.replace('_', ' ')}: {value}" for field, value in drivers) or 'none stand out'
+    message = (f"My health risk check came back {'high' if high_risk else 'low'} risk. "
+               f"The factors raising my risk most are: {factors}. What should I do?")
+    completion = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": HEALTHBOT_PROMPT},
+            {"role": "user", "content": message},
+        ],
+        temperature=0.4,
+        max_tokens=350,
+    )
+    return completion.choices[0].message.content if completion and completion.choices else None
+
+# After a prediction, advice for the session is generated in the background so the chat's first answer
+# is ready; ADVICE_PRECOMPUTE=high (default) only for high-risk results, all, or off. Needs OPENAI_API_KEY.
+advice_mode = os.environ.get('ADVICE_PRECOMPUTE', 'high')
+advisor = None
+if advice_mode in ('high', 'all') and os.environ.get('OPENAI_API_KEY'):
+    advisor = AdvicePrecomputer(generate_advice, workers=int(os.environ.get('ADVICE_WORKERS', '2')))
+
+with startup.step('open history store'):
+    history = HistoryStore(os.environ.get('HISTORY_DB_PATH', 'data/history.db'))
+
+# Dashboard rollups, updated per prediction and checkpointed every AGGREGATES_CHECKPOINT_SECONDS
+with startup.step('load aggregates'):
+    aggregates = AggregateStore(
+        os.environ.get('AGGREGATES_PATH', 'data/aggregates.json'),
+        dimensions=[d for d in os.environ.get('AGGREGATE_DIMENSIONS', ','.join(DEFAULT_DIMENSIONS)).split(',') if d],
+        bucket_seconds=int(os.environ.get('AGGREGATE_BUCKET_SECONDS', '3600')),
+        checkpoint_interval=float(os.environ.get('AGGREGATES_CHECKPOINT_SECONDS', '60')),
+    )
+
+# Bundles trained before the schema was stored get one built from the generator's categories and bounds
+validator = RowValidator(model_bundle.get('schema') or build_schema(categorical_features, numeric_features),
+                         categorical_features, numeric_features)
+
+# Bundles trained before drift sketches existed simply run without a monitor
+drift_monitor = DriftMonitor(model_bundle['drift_reference']) if model_bundle.get('drift_reference') else None
+
+def parse_profile(form):
+    """Build a model row from form or JSON values; raises SchemaError (a ValueError) on bad input."""
+    if not hasattr(form, 'get'):
+        raise ValueError('profile must be an object mapping fields to values')
+    return validator.parse(form)
+
+# Representative profile used to exercise the scoring path before taking traffic
+WARMUP_PROFILE = {
+    'gender': 'Female', 'body_type': 'Average', 'diet_type': 'Mixed', 'physical_activity': 'Sometimes',
+    'family_history': 'None', 'stress_level': 'Medium', 'smoking': 'No', 'alcohol': 'No',
+    'junk_food_freq': 'Weekly', 'age': '40', 'sleep_hours': '7', 'water_intake_liters': '2.5',
+    'height_cm': '168', 'weight_kg': '66', 'glucose': '95', 'systolic_bp': '120',
+    'diastolic_bp': '80', 'sugar': '110',
+}
+
+ready = threading.Event()
+
+def warmup():
+    """Pay first-call costs (sklearn validation paths, pandas, Jinja compile) before /ready succeeds."""
+    with startup.step('warmup'):
+        row = parse_profile(WARMUP_PROFILE)
+        for bundle in router.bundles.values():
+            if bundle is None:
+                continue
+            for _ in range(3):
+                bundle['pipeline'].predict_proba(bundle_frame(bundle, [row]))
+            bundle['pipeline'].predict_proba(bundle_frame(bundle, [row] * 64))
+        for name, scorer in router.heads.items():
+            scorer.score(bundle_frame(router.bundles[name], [row]))
+        app.jinja_env.get_template('index.html')
+    startup.mark_ready()
+    ready.set()
+    if startup.enabled:
+        print(startup.report(), flush=True)
+    budget = float(os.environ.get('STARTUP_BUDGET', '0'))
+    if budget and startup.ready_after > budget:
+        app.logger.warning('startup took %.2fs, over the %.2fs budget', startup.ready_after, budget)
+
+@app.route('/ready', methods=['GET'])
+def readiness():
+    if not ready.is_set():
+        return jsonify({'status': 'warming up'}), 503
+    return jsonify({'status': 'ready', 'startup_seconds': round(startup.ready_after, 3)})
+
 @app.route('/')
 def home():
     return render_template('index.html')
@@ -22,115 +230,361 @@ def home():
 @app.route('/predict', methods=['POST'])
 def predict():
     try:
-        # Extract fields from form, matching training feature names
         form = request.form
-
-        def get_select(name):
-            return (form.get(name) or '').strip()
-
-        def get_float(name, default=None):
-            val = (form.get(name) or '').strip().lower().replace('l', '')
-            if val == '':
-                return default
-            return float(val)
-
-        # Required height/weight
-        height_cm = get_float('height_cm')
-        weight_kg = get_float('weight_kg')
-        if height_cm is None or weight_kg is None:
-            return jsonify({'error': 'height_cm and weight_kg are required'}), 400
-        bmi = None
+        tenant = form.get('tenant_id') or request.headers.get('X-Tenant-Id')
+        if tenant and tenants is not None:
+            return predict_for_tenant(tenant, form)
         try:
-            h_m = height_cm / 100.0
-            if h_m > 0:
-                bmi = round(weight_kg / (h_m * h_m), 1)
-        except Exception:
-            return jsonify({'error': 'Invalid height/weight values'}), 400
-
-        row = {
-            'gender': get_select('gender'),
-            'body_type': get_select('body_type'),
-            'diet_type': get_select('diet_type'),
-            'physical_activity': get_select('physical_activity'),
-            'family_history': get_select('family_history'),
-            'stress_level': get_select('stress_level'),
-            'smoking': get_select('smoking'),
-            'alcohol': get_select('alcohol'),
-            'junk_food_freq': get_select('junk_food_freq'),
-            'age': get_float('age'),
-            'sleep_hours': get_float('sleep_hours'),
-            'water_intake_liters': get_float('water_intake_liters'),
-            'bmi': bmi,
-            'height_cm': height_cm,
-            'weight_kg': weight_kg,
-            'glucose': get_float('glucose'),
-            'systolic_bp': get_float('systolic_bp'),
-            'diastolic_bp': get_float('diastolic_bp'),
-            'sugar': get_float('sugar'),
-        }
-
-        # Create DataFrame with correct column order
-        import pandas as pd
-        X = pd.DataFrame([row], columns=categorical_features + numeric_features)
-
-        prediction = pipeline.predict(X)[0]
-        result = "⚠️ High Risk" if int(prediction) == 1 else "✅ Low Risk"
-        return render_template('index.html', result=result)
+            with span('parse'):
+                row = parse_profile(form)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if drift_monitor is not None:
+            drift_monitor.update(row)
+
+        # Sticky routing key so a user keeps seeing the same model in split mode
+        user_key = form.get('user_id') or request.headers.get('X-User-Id')
+        session_key = form.get('session_id') or request.headers.get('X-Session-Id') or user_key
+        if session_key is None and advisor is not None:
+            # The page echoes this back on resubmits and chat messages
+            session_key = uuid.uuid4().hex
+        with span('score'):
+            served, prob, heads = router.score(row, key=user_key, session=session_key)
+
+        if user_key:
+            history.record(user_key, risk=prob > 0.5, probability=prob,
+                           model=router.bundles[served].get('model_version'), features=row)
+
+        aggregates.record(row, prob, high=prob > 0.5)
+
+        if advisor is not None:
+            if prob > 0.5 or advice_mode == 'all':
+                advisor.submit(session_key, router.bundles[served], row, prob)
+            else:
+                # Advice precomputed for an earlier, high-risk input must not answer the next chat
+                advisor.discard(session_key)
+
+        return render_result(router.bundles[served], row, prob, heads, session_key)
 
     except Exception as e:
         return jsonify({'error': str(e)})
 
+def predict_for_tenant(tenant, form):
+    try:
+        with span('load tenant model'):
+            model = tenants.get(tenant)
+    except UnknownTenant as e:
+        return jsonify({'error': str(e)}), 404
+    try:
+        with span('parse'):
+            row = model.validator.parse(form)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    with span('score', tenant=tenant):
+        prob, heads = tenants.score(model, row)
+
+    user_key = form.get('user_id') or request.headers.get('X-User-Id')
+    if user_key:
+        history.record(user_key, risk=prob > 0.5, probability=prob,
+                       model=f"{tenant}/{model.bundle.get('model_version')}", features=row)
+    if advisor is not None and form.get('session_id'):
+        # Tenant predictions are not precomputed; drop advice left from an earlier one
+        advisor.discard(form.get('session_id'))
+    return render_result(model.bundle, row, prob, heads, form.get('session_id'))
+
+def render_result(bundle, row, prob, heads, session_id):
+    result = "⚠️ High Risk" if prob > 0.5 else "✅ Low Risk"
+    risks = [(HEAD_TITLES.get(name, name), round(p * 100, 1)) for name, p in heads.items()]
+    # Rank against the bundle's precomputed cohort tables (absent in older bundles)
+    tables = bundle.get('risk_percentiles')
+    percentile = risk_percentile(tables, row, prob) if tables else None
+    with span('render'):
+        return render_template('index.html', result=result, risks=risks, percentile=percentile,
+                               session_id=session_id)
+
+@app.route('/api/what-if', methods=['POST'])
+def what_if():
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'request body must be a JSON object'}), 400
+    try:
+        base = parse_profile(data.get('base') or {})
+        grid, axes = build_grid(base, data.get('vary') or {}, categorical_features, numeric_features,
+                                validator=validator)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        # Row 0 of the grid is the unmodified base profile; one predict_proba scores everything
+        with span('score', rows=len(grid)):
+            probs = router.bundles['primary']['pipeline'].predict_proba(grid)[:, 1]
+        shape = [len(values) for _, values in axes]
+        return jsonify({
+            'base_probability': float(probs[0]),
+            'fields': [field for field, _ in axes],
+            'axes': {field: values for field, values in axes},
+            'shape': shape,
+            'variants': int(len(grid) - 1),
+            'probabilities': probs[1:].reshape(shape).round(4).tolist(),
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/feedback', methods=['POST'])
+def feedback():
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'request body must be a JSON object'}), 400
+    try:
+        row = parse_profile(data.get('features') or {})
+        label = parse_label(data.get('label'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    user_key = data.get('user_id') or request.headers.get('X-User-Id')
+    feedback_log.write({'ts': time.time(), 'user_id': user_key, 'label': label, 'features': row,
+                        'model': router.bundles['primary'].get('model_version')})
+    # Only enqueues; learning and model swaps happen on the learner's thread
+    queued = learner.submit(row, label) if learner is not None else False
+    return jsonify({'recorded': True, 'learning': queued}), 202
+
+@app.route('/api/feedback', methods=['GET'])
+def feedback_stats():
+    if learner is None:
+        return jsonify({'error': 'online learning is disabled'}), 404
+    return jsonify(learner.stats())
+
+@app.route('/api/simulate', methods=['POST'])
+def simulate():
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'request body must be a JSON object'}), 400
+    try:
+        result = simulator.simulate(
+            int(data.get('n', 100000)),
+            scenario=data.get('scenario') or {},
+            seed=int(data.get('seed', 0)),
+            include_baseline=bool(data.get('include_baseline', True)),
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    return jsonify(result)
+
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    return jsonify({'error': f'request body exceeds {BULK_MAX_UPLOAD_BYTES} bytes'}), 413
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    # Multipart upload in the 'file' field, or the CSV as the raw request body
+    upload = request.files.get('file')
+    if upload is None and not request.content_length:
+        return jsonify({'error': "upload a CSV in the 'file' field or as the request body"}), 400
+
+    def save(path):
+        if upload is not None:
+            upload.save(path)
+            return
+        # Bodies without a Content-Length were refused above, so MAX_CONTENT_LENGTH already bounds this copy
+        with open(path, 'wb') as f:
+            for block in iter(lambda: request.stream.read(1 << 16), b''):
+                f.write(block)
+
+    try:
+        job = bulk_jobs.submit(save)
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 429
+
+    return jsonify({
+        'job_id': job.id,
+        'status_url': f'/api/jobs/{job.id}',
+        'results_url': f'/api/jobs/{job.id}/results',
+    }), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    status = bulk_jobs.status(job_id)
+    if status is None:
+        return jsonify({'error': 'unknown or expired job'}), 404
+    return jsonify(status)
+
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id):
+    job = bulk_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'unknown or expired job'}), 404
+    if job.status != 'done':
+        return jsonify({'error': f'job is {job.status}', 'status': job.status}), 409
+    return Response(bulk_jobs.iter_results(job), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename={job_id}.csv'})
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    if not bulk_jobs.cancel(job_id):
+        return jsonify({'error': 'unknown or expired job'}), 404
+    return jsonify(bulk_jobs.status(job_id) or {'job_id': job_id, 'status': 'deleted'})
+
+@app.route('/admin/profile', methods=['POST'])
+def admin_profile():
+    # Disabled unless ADMIN_TOKEN is configured; the caller must send it in X-Admin-Token
+    token = os.environ.get('ADMIN_TOKEN')
+    supplied = request.headers.get('X-Admin-Token', '')
+    if not token or not hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+        return jsonify({'error': 'forbidden'}), 403
+    seconds = min(max(request.args.get('seconds', default=10, type=float), 0.1), 120)
+    interval = min(max(request.args.get('interval_ms', default=5, type=float), 1), 100) / 1000.0
+    try:
+        result = profiler.profile(seconds, interval=interval)
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+    if request.args.get('format') == 'folded':
+        return Response(result['folded'] + '\n', mimetype='text/plain')
+    return jsonify(result)
+
+@app.route('/api/schema', methods=['GET'])
+def schema():
+    return jsonify(dict(validator.schema, validation=validator.stats()))
+
+@app.route('/api/advice', methods=['GET'])
+def advice_stats():
+    if advisor is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(advisor.stats(), enabled=True, mode=advice_mode))
+
+@app.route('/api/tenants', methods=['GET'])
+def tenant_stats():
+    if tenants is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(tenants.stats(), enabled=True))
+
+@app.route('/api/models', methods=['GET'])
+def models():
+    return jsonify(router.stats())
+
+@app.route('/api/history', methods=['GET'])
+def history_stats():
+    return jsonify(history.stats())
+
+@app.route('/api/history/<user_id>', methods=['GET'])
+def user_history(user_id):
+    try:
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        max_points = min(request.args.get('max_points', default=500, type=int), 5000)
+        return jsonify(history.query(user_id, start=start, end=end, max_points=max(max_points, 1)))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/aggregates', methods=['GET'])
+def aggregate_rollup():
+    start = request.args.get('start', type=float)
+    end = request.args.get('end', type=float)
+    dimension = request.args.get('dimension')
+    try:
+        if request.args.get('series'):
+            # e.g. ?dimension=gender&series=Female, or ?series=_all for the overall rate over time
+            series = request.args['series']
+            return jsonify(aggregates.series(dimension or '_all', series, start=start, end=end))
+        return jsonify(aggregates.query(dimension, start=start, end=end))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/drift', methods=['GET'])
+def drift():
+    if drift_monitor is None:
+        return jsonify({'error': 'model bundle has no drift reference; retrain with train_model.py'}), 404
+    report = drift_monitor.report()
+    if request.args.get('reset') == '1':
+        drift_monitor.reset()
+    return jsonify(report)
+
+def get_openai_client(api_key):
+    """Import the OpenAI SDK and build a client on first use; None if the SDK is missing."""
+    global _openai_client
+    with _openai_lock:
+        if _openai_client is None or _openai_client.api_key != api_key:
+            try:
+                from openai import OpenAI
+            except Exception:
+                return None
+            _openai_client = OpenAI(api_key=api_key)
+        return _openai_client
+
+def with_cors(response):
+    # Minimal CORS support for local dev (so public/login.html on another port can call this)
+    response.headers['Access-Control-Allow-Origin'] = request.headers.get('Origin', '*')
+    response.headers['Vary'] = 'Origin'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
+    return response
+
 # Simple chat endpoint that proxies to OpenAI's Chat Completions API
 @app.route('/api/chat', methods=['POST'])
 def chat():
     try:
-        if OpenAI is None:
-            return jsonify({ 'error': 'OpenAI SDK not installed. Run: pip install openai>=1.40.0' }), 500
-
         data = request.get_json(silent=True) or {}
         user_message = (data.get('message') or '').strip()
         if not user_message:
             return jsonify({ 'error': 'message is required' }), 400
 
+        # Red-flag symptoms skip every canned answer, the precomputed advice included
+        urgent = red_flag(user_message)
+
+        # Curated local answers first; only unmatched questions go to the LLM
+        if faq_index is not None and not urgent:
+            with span('faq'):
+                entry, score = faq_index.answer(user_message)
+            if entry is not None:
+                app.logger.info('faq hit %s (score %.2f, hit rate %.1f%%)',
+                                entry['id'], score, faq_index.hit_rate() * 100)
+                return with_cors(jsonify({ 'reply': entry['answer'], 'source': 'faq', 'faq_id': entry['id'] }))
+            # Logged so the corpus can be grown from frequent misses
+            app.logger.info('faq miss (best score %.2f, hit rate %.1f%%): %s',
+                            score, faq_index.hit_rate() * 100, user_message[:200])
+
+        # A request for advice after a prediction gets the advice precomputed for it
+        session_key = data.get('session_id') or request.headers.get('X-Session-Id')
+        if advisor is not None and session_key and not urgent and asks_for_advice(user_message):
+            with span('advice'):
+                advice = advisor.take(session_key, timeout=float(os.environ.get('ADVICE_WAIT_SECONDS', '10')))
+            if advice:
+                return with_cors(jsonify({ 'reply': advice, 'source': 'advice' }))
+
         api_key = os.environ.get('OPENAI_API_KEY')
         if not api_key:
             return jsonify({ 'error': 'OPENAI_API_KEY environment variable not set' }), 500
 
-        client = OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
+        if client is None:
+            return jsonify({ 'error': 'OpenAI SDK not installed. Run: pip install openai>=1.40.0' }), 500
 
-        # System prompt tailored for health guidance disclaimers
-        system_prompt = (
-            "You are HealthBot, a helpful assistant for general wellness and education. "
-            "Provide clear, empathetic, evidence-informed guidance. Do not offer diagnoses. "
-            "Add a brief disclaimer to consult a medical professional for personal medical advice."
-        )
-
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message},
-            ],
-            temperature=0.4,
-            max_tokens=350,
-        )
+        with span('llm', model='gpt-4o-mini'):
+            completion = client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": HEALTHBOT_PROMPT},
+                    {"role": "user", "content": user_message},
+                ],
+                temperature=0.4,
+                max_tokens=350,
+            )
 
         reply = completion.choices[0].message.content if completion and completion.choices else "I'm sorry, I couldn't generate a response."
 
-        # Minimal CORS support for local dev (so public/login.html on another port can call this)
-        response = jsonify({ 'reply': reply })
-        response.headers['Access-Control-Allow-Origin'] = request.headers.get('Origin', '*')
-        response.headers['Vary'] = 'Origin'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
-        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
-        return response
+        return with_cors(jsonify({ 'reply': reply, 'source': 'llm' }))
     except Exception as e:
-        response = jsonify({ 'error': str(e) })
-        response.headers['Access-Control-Allow-Origin'] = request.headers.get('Origin', '*')
-        response.headers['Vary'] = 'Origin'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
-        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
-        return response, 500
+        return with_cors(jsonify({ 'error': str(e) })), 500
+
+# Warm up off the import path so /ready can report progress; WARMUP=0 disables it
+if os.environ.get('WARMUP', '1') == '1':
+    threading.Thread(target=warmup, name='warmup', daemon=True).start()
+else:
+    startup.mark_ready()
+    ready.set()
 
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Microbenchmark: session delta re-scoring vs full pipeline scoring.
+
+    python bench_delta_scoring.py [--model model/model.pkl] [--sessions 200] [--edits 20]
+
+Each session submits a synthetic profile and then resubmits it `--edits` times
+with one or two fields changed, the way users tweak the form between /predict
+calls. Reports per-call latency for each scoring path and the largest probability
+difference from the full pipeline.
+"""
+import argparse
+import time
+
+import joblib
+import numpy as np
+
+import synthetic
+from delta_scoring import SessionScorer
+from model_router import bundle_frame
+from multihead import MultiHeadScorer
+
+
+def make_edits(rng, base, n_edits):
+    rows = [base]
+    for _ in range(n_edits):
+        row = dict(rows[-1])
+        fields = [f for f in list(synthetic.CATEGORIES) + list(synthetic.CLIP_BOUNDS) if f in row]
+        for field in rng.choice(fields, size=rng.randint(1, 3), replace=False):
+            if field in synthetic.CATEGORIES:
+                row[field] = str(rng.choice(synthetic.CATEGORIES[field]))
+            else:
+                lo, hi = synthetic.CLIP_BOUNDS[field]
+                row[field] = round(float(np.clip(row[field] + rng.normal(0, (hi - lo) / 20), lo, hi)), 1)
+        h_m = row['height_cm'] / 100.0
+        row['bmi'] = round(row['weight_kg'] / (h_m * h_m), 1)
+        rows.append(row)
+    return rows
+
+
+def timed(fn, items):
+    start = time.perf_counter()
+    out = [fn(item) for item in items]
+    return out, (time.perf_counter() - start) / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default='model/model.pkl')
+    parser.add_argument('--sessions', type=int, default=200)
+    parser.add_argument('--edits', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    bundle = joblib.load(args.model)
+    columns = bundle['categorical_features'] + bundle['numeric_features']
+    rng = np.random.RandomState(args.seed)
+    data = synthetic.generate(args.sessions, rng)
+    bases = [{k: (v.item() if hasattr(v, 'item') else v) for k, v in rec.items() if k in columns or k in
+              ('height_cm', 'weight_kg')} for rec in data.to_dict('records')]
+    sessions = [make_edits(rng, base, args.edits) for base in bases]
+    first = [(i, rows[0]) for i, rows in enumerate(sessions)]
+    edits = [(i, row) for i, rows in enumerate(sessions) for row in rows[1:]]
+
+    pipeline = bundle['pipeline']
+    reference, pipeline_us = timed(lambda item: pipeline.predict_proba(bundle_frame(bundle, [item[1]]))[0, 1],
+                                   edits)
+    results = {'pipeline.predict_proba': pipeline_us}
+    if bundle.get('heads'):
+        heads = MultiHeadScorer(bundle['heads'])
+        _, results['MultiHeadScorer (all heads)'] = timed(lambda item: heads.score(bundle_frame(bundle, [item[1]])),
+                                                          edits)
+
+    scorer = SessionScorer(max_sessions=args.sessions)
+    if not scorer.supports(bundle):
+        print('Bundle is not linear; delta scoring does not apply.')
+        return
+    _, results['SessionScorer full (new session)'] = timed(lambda item: scorer.score(bundle, item[0], item[1]),
+                                                           first)
+    # Edits are replayed session by session so every call after the first is a delta update
+    delta, results['SessionScorer delta (resubmission)'] = timed(
+        lambda item: scorer.score(bundle, item[0], item[1])['risk'], edits)
+
+    print(f"{len(edits)} resubmissions over {args.sessions} sessions ({args.edits} edits each)")
+    for name, us in results.items():
+        print(f"  {name:<36} {us:10.1f} µs/call  ({pipeline_us / us:5.1f}x)")
+    print(f"  max |delta - pipeline| probability: {np.max(np.abs(np.array(delta) - np.array(reference))):.2e}")
+    print(f"  {scorer.stats()}")
+
+
+if __name__ == '__main__':
+    main()
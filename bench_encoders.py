@@ -0,0 +1,90 @@
+"""Benchmark: one-hot vs feature hashing for a high-cardinality categorical input.
+
+    python bench_encoders.py [--n 50000] [--cardinalities 10,100,1000,10000,100000] [--width 1024]
+
+Adds a synthetic `clinic_id` column with the given number of distinct values
+(Zipf-distributed, with a small per-clinic effect on the label) to the generated
+training data, then fits the logistic pipeline with `clinic_id` one-hot encoded
+and with it hashed into `--width` buckets. Reports fit time, pickled bundle size,
+single-row and 10k-row batch scoring latency, and test ROC-AUC.
+"""
+import argparse
+import pickle
+import time
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+
+import synthetic
+from train_model import MODEL_CONFIGS, build_preprocessor, categorical_features, numeric_features
+
+
+def with_clinics(data, cardinality, rng):
+    ids = (rng.zipf(1.3, len(data)) - 1) % cardinality
+    ids = rng.permutation(cardinality)[ids]
+    effect = rng.normal(0, 0.5, cardinality)[ids]
+    data = data.copy()
+    data['clinic_id'] = np.char.add('clinic-', ids.astype(str))
+    # Shift the label for clinics with a strong effect so the feature carries some signal
+    flip = rng.rand(len(data)) < np.abs(effect) * 0.1
+    data.loc[flip, 'risk'] = (effect[flip] > 0).astype(int)
+    return data
+
+
+def build(hashed, width):
+    cat = categorical_features + ['clinic_id']
+    params = MODEL_CONFIGS['logistic']
+    return Pipeline(steps=[
+        ('prep', build_preprocessor({'clinic_id': width} if hashed else None, categorical=cat)),
+        ('model', LogisticRegression(C=params['C'], max_iter=params['max_iter'])),
+    ])
+
+
+def latency_us(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=50000)
+    parser.add_argument('--cardinalities', default='10,100,1000,10000,100000')
+    parser.add_argument('--width', type=int, default=1024)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(args.seed)
+    base = synthetic.generate(args.n, rng)
+    columns = categorical_features + ['clinic_id'] + numeric_features
+    print(f"{args.n} rows, hashed width {args.width}")
+    print(f"{'cardinality':>11} {'encoder':<8} {'features':>9} {'fit s':>7} {'bundle KB':>10} "
+          f"{'1 row µs':>9} {'10k rows ms':>12} {'AUC':>7}")
+    for cardinality in [int(c) for c in args.cardinalities.split(',')]:
+        data = with_clinics(base, cardinality, rng)
+        X_train, X_test, y_train, y_test = train_test_split(data[columns], data['risk'], test_size=0.2,
+                                                            random_state=args.seed, stratify=data['risk'])
+        one = X_test.iloc[:1]
+        batch = X_test.iloc[:10000]
+        for name, hashed in (('one-hot', False), ('hashing', True)):
+            pipeline = build(hashed, args.width)
+            start = time.perf_counter()
+            pipeline.fit(X_train, y_train)
+            fit_s = time.perf_counter() - start
+            size_kb = len(pickle.dumps(pipeline, protocol=pickle.HIGHEST_PROTOCOL)) / 1024
+            width = pipeline.named_steps['model'].coef_.shape[1]
+            single = latency_us(lambda: pipeline.predict_proba(one), 200)
+            bulk = latency_us(lambda: pipeline.predict_proba(batch), 5) / 1000
+            auc = roc_auc_score(y_test, pipeline.predict_proba(X_test)[:, 1])
+            print(f"{cardinality:>11} {name:<8} {width:>9} {fit_s:>7.2f} {size_kb:>10.1f} "
+                  f"{single:>9.0f} {bulk:>12.1f} {auc:>7.4f}")
+
+
+if __name__ == '__main__':
+    main()
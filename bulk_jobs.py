@@ -0,0 +1,319 @@
+"""Asynchronous bulk scoring of uploaded CSV files.
+
+Uploads are spooled to disk and queued; one dispatcher thread reads each file in
+chunks and scores them on a bounded process pool whose workers load the model
+bundle once. Every chunk is written to its own part file, so results can be
+streamed back in order without holding a whole job in memory.
+"""
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from multihead import MultiHeadScorer
+from schema import RowValidator, build_schema
+
+CHUNK_SIZE = 5000
+MAX_ROWS = 1000000
+FINISHED = ('done', 'failed', 'cancelled')
+_JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+_worker_bundle = None
+_worker_heads = None
+_worker_validator = None
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def make_validator(bundle):
+    cat, num = bundle['categorical_features'], bundle['numeric_features']
+    return RowValidator(bundle.get('schema') or build_schema(cat, num), cat, num)
+
+
+def _init_worker(model_path):
+    global _worker_bundle, _worker_heads, _worker_validator
+    _worker_bundle = joblib.load(model_path)
+    _worker_heads = MultiHeadScorer(_worker_bundle['heads']) if _worker_bundle.get('heads') else None
+    _worker_validator = make_validator(_worker_bundle)
+
+
+def score_chunk(bundle, heads, validator, start, frame, id_column=None):
+    """Score one chunk of raw CSV rows; rows failing schema validation get an error instead of a score."""
+    X, errors = validator.parse_batch(frame)
+    valid = errors == ''
+
+    out = pd.DataFrame({'row': np.arange(start, start + len(frame))})
+    if id_column and id_column in frame:
+        out[id_column] = frame[id_column].to_numpy()
+    probs = np.full((len(frame), len(heads.names) if heads is not None else 0), np.nan)
+    if heads is not None and valid.any():
+        probs[valid] = heads.predict_proba(X[valid])
+    # A logistic primary is itself the 'risk' head, so its rows are only transformed once
+    if heads is not None and 'risk' in heads.names:
+        prob = probs[:, heads.names.index('risk')]
+    else:
+        prob = np.full(len(frame), np.nan)
+        if valid.any():
+            prob[valid] = bundle['pipeline'].predict_proba(X[valid])[:, 1]
+    out['probability'] = prob.round(6)
+    out['risk'] = pd.Series(prob > 0.5, dtype='Int64').where(valid)
+    for i, name in enumerate(heads.names if heads is not None else ()):
+        if name != 'risk':
+            out[name] = probs[:, i].round(6)
+    out['error'] = errors
+    return out
+
+
+def _worker_chunk(start, frame, out_path, header, id_column):
+    out = score_chunk(_worker_bundle, _worker_heads, _worker_validator, start, frame, id_column)
+    out.to_csv(out_path, index=False, header=header)
+    return len(out), int((out['error'] != '').sum()), _worker_bundle.get('model_version')
+
+
+def _count_rows(path):
+    # Data lines only; fast enough to give progress a denominator before scoring starts
+    lines, last = 0, b'\n'
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    lines += last != b'\n'
+    return max(lines - 1, 0)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, but belongs to another user
+        pass
+    return True
+
+
+class Job:
+    def __init__(self, job_id, job_dir):
+        self.id = job_id
+        self.dir = job_dir
+        self.status = 'queued'
+        self.cancelled = False
+        self.error = None
+        self.rows_total = None
+        self.rows_done = 0
+        self.rows_rejected = 0
+        self.parts = 0
+        self.model_version = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+    @property
+    def input_path(self):
+        return os.path.join(self.dir, 'input.csv')
+
+    def part_path(self, i):
+        return os.path.join(self.dir, f'part-{i:05d}.csv')
+
+    def to_dict(self, ttl):
+        progress = None
+        if self.rows_total:
+            progress = round(self.rows_done / self.rows_total, 4)
+        elif self.status == 'done':
+            progress = 1.0
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'rows_total': self.rows_total,
+            'rows_done': self.rows_done,
+            'rows_rejected': self.rows_rejected,
+            'progress': progress,
+            'model_version': self.model_version,
+            'error': self.error,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'expires_at': self.finished + ttl if self.finished else None,
+        }
+
+
+class JobManager:
+    """Queue of bulk-scoring jobs run on a bounded worker pool.
+
+    At most `max_jobs` jobs may be queued or running; further submissions raise
+    JobQueueFull. Finished jobs keep their results for `ttl` seconds and are then
+    deleted by the dispatcher's periodic sweep.
+
+    Job state lives in this process's memory, and its files under
+    `<job_dir>/<pid>/`, so several server processes can share `job_dir` without
+    deleting each other's jobs; each job is only visible to the process that
+    accepted it.
+    """
+
+    def __init__(self, model_path, job_dir='data/jobs', max_workers=2, max_jobs=8, chunk_size=CHUNK_SIZE,
+                 ttl=3600, max_rows=MAX_ROWS, id_column='id', sweep_interval=30):
+        self.model_path = model_path
+        self.job_dir = os.path.join(job_dir, str(os.getpid()))
+        self.max_workers = max_workers
+        self.max_jobs = max_jobs
+        self.chunk_size = chunk_size
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.id_column = id_column
+        self.sweep_interval = sweep_interval
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._pool = None
+
+        # Jobs only live in memory, so directories of processes that are gone (including an earlier
+        # process with this pid) are orphans; other live processes' directories are left alone
+        os.makedirs(job_dir, exist_ok=True)
+        for name in os.listdir(job_dir):
+            path = os.path.join(job_dir, name)
+            if _JOB_ID.match(name) or (name.isdigit() and (int(name) == os.getpid() or not _pid_alive(int(name)))):
+                shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(self.job_dir, exist_ok=True)
+        threading.Thread(target=self._dispatch, name='bulk-jobs', daemon=True).start()
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                             initargs=(self.model_path,))
+        return self._pool
+
+    def submit(self, save):
+        """Create a job; `save(path)` writes the uploaded CSV to `path`."""
+        with self._lock:
+            active = sum(job.status not in FINISHED for job in self.jobs.values())
+            if active >= self.max_jobs:
+                raise JobQueueFull(f"{active} jobs already queued or running (limit {self.max_jobs})")
+            job_id = uuid.uuid4().hex
+            job = self.jobs[job_id] = Job(job_id, os.path.join(self.job_dir, job_id))
+        try:
+            os.makedirs(job.dir)
+            save(job.input_path)
+        except Exception:
+            with self._lock:
+                del self.jobs[job_id]
+            shutil.rmtree(job.dir, ignore_errors=True)
+            raise
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def status(self, job_id):
+        job = self.get(job_id)
+        return job.to_dict(self.ttl) if job is not None else None
+
+    def cancel(self, job_id):
+        """Cancel a queued/running job or delete a finished one; False if unknown."""
+        job = self.get(job_id)
+        if job is None:
+            return False
+        job.cancelled = True
+        if job.status == 'queued':
+            self._finish(job, 'cancelled')
+        elif job.status in FINISHED:
+            self._remove(job)
+        return True
+
+    def iter_results(self, job, block_size=1 << 16):
+        for i in range(job.parts):
+            with open(job.part_path(i), 'rb') as f:
+                for block in iter(lambda: f.read(block_size), b''):
+                    yield block
+
+    def _finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        job.finished = time.time()
+        if status != 'done':
+            shutil.rmtree(job.dir, ignore_errors=True)
+
+    def _remove(self, job):
+        with self._lock:
+            self.jobs.pop(job.id, None)
+        shutil.rmtree(job.dir, ignore_errors=True)
+
+    def _sweep(self):
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self.jobs.values()
+                       if job.status in FINISHED and job.finished + self.ttl < now]
+        for job in expired:
+            self._remove(job)
+
+    def _dispatch(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=self.sweep_interval)
+            except queue.Empty:
+                job = None
+            self._sweep()
+            if job is not None and job.status == 'queued':
+                self._run(job)
+
+    def _run(self, job):
+        job.status = 'running'
+        job.started = time.time()
+        pending = deque()
+        try:
+            job.rows_total = _count_rows(job.input_path)
+            if job.rows_total > self.max_rows:
+                raise ValueError(f"file has {job.rows_total} rows; the limit is {self.max_rows}")
+            pool = self._get_pool()
+            # Keep category strings such as 'None' verbatim; only empty cells are missing
+            reader = pd.read_csv(job.input_path, chunksize=self.chunk_size, dtype=str,
+                                 keep_default_na=False, na_values=[''])
+            start = 0
+            for i, frame in enumerate(reader):
+                if job.cancelled:
+                    break
+                # Bound the chunks in flight so a large file is never fully in memory
+                while len(pending) >= self.max_workers * 2:
+                    self._collect(job, pending.popleft())
+                pending.append(pool.submit(_worker_chunk, start, frame, job.part_path(i), i == 0,
+                                           self.id_column))
+                job.parts = i + 1
+                start += len(frame)
+            while pending and not job.cancelled:
+                self._collect(job, pending.popleft())
+        except Exception as e:
+            self._drain(pending)
+            self._finish(job, 'failed', error=str(e))
+            return
+        if job.cancelled:
+            self._drain(pending)
+            self._finish(job, 'cancelled')
+        else:
+            self._finish(job, 'done')
+
+    def _collect(self, job, future):
+        rows, rejected, model_version = future.result()
+        job.rows_done += rows
+        job.rows_rejected += rejected
+        job.model_version = model_version
+
+    def _drain(self, pending):
+        # Running chunks cannot be interrupted; wait for them before the job directory goes away
+        for future in pending:
+            if not future.cancel():
+                try:
+                    future.result()
+                except Exception:
+                    pass
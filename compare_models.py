@@ -0,0 +1,103 @@
+"""Compare the model options on production cost as well as accuracy.
+
+Reuses the cached generate/split stages from train_model.py, fits every entry in
+MODEL_CONFIGS on the same split and reports fit time, single-row and batch scoring
+latency, pickled bundle size and holdout metrics.
+
+    python compare_models.py [--n 5000] [--repeats 200] [--out model/model_comparison.json]
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+from evaluation import bootstrap_metrics
+from stage_cache import StageCache
+from train_model import (DEFAULT_CONFIG, MODEL_CONFIGS, categorical_features, generate_stage,
+                         numeric_features, split_data, build_pipeline)
+
+
+def _latencies(fn, repeats):
+    out = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        out[i] = time.perf_counter() - start
+    return out * 1000.0
+
+
+def compare(split, repeats=200, batch_size=1000, n_boot=500, seed=42):
+    X_train, X_test, y_train, y_test = split
+    single = X_test.iloc[[0]]
+    batch = X_test.sample(batch_size, replace=len(X_test) < batch_size, random_state=seed)
+
+    rows = []
+    for name, model in MODEL_CONFIGS.items():
+        clf = build_pipeline(model)
+        start = time.perf_counter()
+        clf.fit(X_train, y_train)
+        fit_s = time.perf_counter() - start
+
+        clf.predict_proba(single)  # first-call overhead is not what we serve
+        one = _latencies(lambda: clf.predict_proba(single), repeats)
+        many = _latencies(lambda: clf.predict_proba(batch), max(repeats // 10, 5))
+
+        bundle = {'pipeline': clf, 'categorical_features': categorical_features,
+                  'numeric_features': numeric_features}
+        prob = clf.predict_proba(X_test)[:, 1]
+        metrics = bootstrap_metrics(y_test.to_numpy(), prob, n_boot=n_boot, seed=seed)
+
+        rows.append({
+            'model': name,
+            'fit_seconds': fit_s,
+            'single_row_ms_p50': float(np.percentile(one, 50)),
+            'single_row_ms_p99': float(np.percentile(one, 99)),
+            'batch_ms_p50': float(np.percentile(many, 50)),
+            'batch_us_per_row': float(np.percentile(many, 50)) * 1000.0 / batch_size,
+            'bundle_bytes': len(pickle.dumps(bundle, protocol=pickle.HIGHEST_PROTOCOL)),
+            'accuracy': metrics['accuracy'],
+            'roc_auc': metrics['roc_auc'],
+            'brier': metrics['brier'],
+        })
+    return rows
+
+
+def format_table(rows):
+    header = (f"{'model':<10} {'fit s':>7} {'1-row p50':>10} {'1-row p99':>10} {'batch us/row':>13} "
+              f"{'bundle KB':>10} {'accuracy':>22} {'roc_auc':>22}")
+    lines = [header, '-' * len(header)]
+    for r in rows:
+        acc, auc = r['accuracy'], r['roc_auc']
+        lines.append(
+            f"{r['model']:<10} {r['fit_seconds']:>7.2f} {r['single_row_ms_p50']:>8.2f}ms {r['single_row_ms_p99']:>8.2f}ms "
+            f"{r['batch_us_per_row']:>13.2f} {r['bundle_bytes'] / 1024:>10.1f} "
+            f"{acc['point']:.3f} [{acc['ci_low']:.3f},{acc['ci_high']:.3f}] "
+            f"{auc['point']:.3f} [{auc['ci_low']:.3f},{auc['ci_high']:.3f}]"
+        )
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--n', type=int, default=DEFAULT_CONFIG['n'])
+    parser.add_argument('--seed', type=int, default=DEFAULT_CONFIG['seed'])
+    parser.add_argument('--repeats', type=int, default=200, help='single-row scoring repetitions')
+    parser.add_argument('--out', default='model/model_comparison.json')
+    args = parser.parse_args()
+
+    cache = StageCache()
+    generated = generate_stage(cache, args.n, args.seed)
+    split = cache.run('split', split_data,
+                      params={'test_size': DEFAULT_CONFIG['test_size'], 'seed': args.seed},
+                      upstream=[generated])
+
+    rows = compare(split.value, repeats=args.repeats, seed=args.seed)
+    print(format_table(rows))
+
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(rows, f, indent=2)
+    print(f"💾 Comparison saved as '{args.out}'")
@@ -0,0 +1,227 @@
+"""One-pass, mergeable column profiles (replaces DataFrame.describe(include='all')).
+
+Each chunk of rows is reduced to per-column state: count, missing, Welford
+mean/variance, min/max and a compacting quantile sketch for numeric columns,
+value counts for the rest. States from separate chunks merge exactly (moments,
+counts) or within the sketch's rank error (quantiles), so chunks can be profiled
+on a process pool and combined in order.
+"""
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+CHUNK_SIZE = 100000
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+TOP_CATEGORIES = 20
+
+
+class QuantileSketch:
+    """KLL-style compactor stack: level h holds items of weight 2**h, at most `k` per level.
+
+    When a level overflows it is sorted and every other item (alternating the
+    starting offset) is promoted to the next level, halving its size. Memory is
+    O(k log(n / k)) and merging two sketches is concatenating levels and compacting.
+    """
+
+    def __init__(self, k=512):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self._offset = 0
+
+    def update(self, values):
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+
+    def merge(self, other):
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self._compact()
+        return self
+
+    def _compact(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # An odd item stays behind so promoted weight is exact
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                paired = items[:len(items) - len(keep)]
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], paired[self._offset::2]])
+                self.levels[h] = keep
+                self._offset ^= 1
+            h += 1
+
+    def quantiles(self, qs):
+        values = np.concatenate(self.levels)
+        if not len(values):
+            return [None] * len(qs)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values, cum = values[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, np.asarray(qs) * cum[-1], side='left')
+        return [float(v) for v in values[np.minimum(idx, len(values) - 1)]]
+
+
+class NumericColumn:
+    def __init__(self):
+        self.count = 0
+        self.missing = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch()
+
+    def update(self, series):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        finite = values[np.isfinite(values)]
+        self.missing += len(values) - len(finite)
+        if len(finite):
+            other = NumericColumn()
+            other.count = len(finite)
+            other.mean = float(finite.mean())
+            other.m2 = float(((finite - other.mean) ** 2).sum())
+            other.min, other.max = float(finite.min()), float(finite.max())
+            self._merge_moments(other)
+            self.sketch.update(finite)
+
+    def _merge_moments(self, other):
+        # Chan et al. parallel combination of Welford (count, mean, M2) states
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def merge(self, other):
+        self.missing += other.missing
+        if other.count:
+            self._merge_moments(other)
+            self.sketch.merge(other.sketch)
+        return self
+
+    def to_dict(self):
+        out = {'type': 'numeric', 'count': self.count, 'missing': self.missing}
+        if self.count:
+            out.update(mean=self.mean, std=float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else 0.0,
+                       min=self.min, max=self.max,
+                       quantiles={f"p{round(q * 100):02d}": v
+                                  for q, v in zip(QUANTILES, self.sketch.quantiles(QUANTILES))})
+        return out
+
+
+class CategoricalColumn:
+    def __init__(self):
+        self.count = 0
+        self.missing = 0
+        self.counts = Counter()
+
+    def update(self, series):
+        # One hashing pass; missing values come back as their own (NaN/None) key
+        for value, count in series.value_counts(dropna=False, sort=False).items():
+            # Categorical dtypes also report their unused categories
+            if not count:
+                continue
+            if pd.isna(value):
+                self.missing += int(count)
+            else:
+                self.count += int(count)
+                self.counts[str(value)] += int(count)
+
+    def merge(self, other):
+        self.count += other.count
+        self.missing += other.missing
+        self.counts.update(other.counts)
+        return self
+
+    def to_dict(self):
+        return {
+            'type': 'categorical',
+            'count': self.count,
+            'missing': self.missing,
+            'distinct': len(self.counts),
+            'top': dict(self.counts.most_common(TOP_CATEGORIES)),
+        }
+
+
+class DataProfile:
+    """Mergeable per-column profile of a table, built one chunk at a time."""
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = {}
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for name in chunk.columns:
+            series = chunk[name]
+            column = self.columns.get(name)
+            if column is None:
+                numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+                column = self.columns[name] = NumericColumn() if numeric else CategoricalColumn()
+            column.update(series)
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        for name, column in other.columns.items():
+            if name in self.columns:
+                self.columns[name].merge(column)
+            else:
+                self.columns[name] = column
+        return self
+
+    def to_dict(self):
+        return {'rows': self.rows, 'columns': {name: c.to_dict() for name, c in self.columns.items()}}
+
+
+def _profile_chunk(chunk):
+    return DataProfile().update(chunk)
+
+
+def profile_frame(data, chunk_size=CHUNK_SIZE, n_jobs=None):
+    """Profile `data` in chunks; with more than one chunk they run on a process pool."""
+    chunks = [data.iloc[i:i + chunk_size] for i in range(0, len(data), chunk_size)] or [data]
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(chunks))
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(_profile_chunk, chunks))
+    else:
+        parts = [_profile_chunk(chunk) for chunk in chunks]
+    profile = parts[0]
+    for part in parts[1:]:
+        profile.merge(part)
+    return profile.to_dict()
+
+
+def _fmt(value):
+    return '-' if value is None else f"{value:.4g}"
+
+
+def format_profile(profile):
+    """Compact text rendering, one line per column (used for the LLM QA prompt)."""
+    lines = [f"rows: {profile['rows']}"]
+    for name, col in profile['columns'].items():
+        head = f"{name}: n={col['count']} missing={col['missing']}"
+        if col['type'] == 'numeric':
+            if not col['count']:
+                lines.append(head)
+                continue
+            q = col['quantiles']
+            lines.append(f"{head} mean={_fmt(col['mean'])} std={_fmt(col['std'])} min={_fmt(col['min'])} "
+                         + ' '.join(f"{k}={_fmt(v)}" for k, v in q.items()) + f" max={_fmt(col['max'])}")
+        else:
+            total = col['count'] or 1
+            top = ', '.join(f"{value} {count / total:.1%}" for value, count in col['top'].items())
+            lines.append(f"{head} distinct={col['distinct']} top: {top}")
+    return '\n'.join(lines)
@@ -0,0 +1,222 @@
+"""Columnar, memory-mapped cache of external training data (CSV, or Parquet with pyarrow).
+
+A source file is converted once, chunk by chunk, into one flat binary file per
+column under data/columnar/<key>/: categorical columns as int32 codes into a
+dictionary stored in meta.json (-1 = missing), numeric columns as float64.
+Later runs open the cached columns with np.memmap, so numeric columns are
+zero-copy views and categoricals are pandas Categoricals over their codes:
+
+    python data_source.py convert records.csv [--cache-dir data/columnar]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = 'data/columnar'
+CHUNK_SIZE = 200000
+# Bump when the on-disk layout changes so older caches are rebuilt
+FORMAT_VERSION = 1
+
+
+def source_key(path, categorical, numeric):
+    """Cache key from the source's identity (path, size, mtime) and the requested columns."""
+    stat = os.stat(path)
+    payload = json.dumps([FORMAT_VERSION, os.path.abspath(path), stat.st_size, stat.st_mtime_ns,
+                          list(categorical), list(numeric)])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _is_parquet(path):
+    return path.endswith('.parquet') or path.endswith('.pq')
+
+
+def _parquet_file(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError('Parquet sources need pyarrow: pip install pyarrow') from None
+    return pq.ParquetFile(path)
+
+
+def source_columns(path):
+    if _is_parquet(path):
+        return list(_parquet_file(path).schema_arrow.names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def _read_chunks(path, columns, categorical, chunk_size):
+    available = set(source_columns(path))
+    missing = [c for c in columns if c not in available]
+    if missing:
+        raise ValueError(f"{path} is missing columns: {missing}")
+    if _is_parquet(path):
+        for batch in _parquet_file(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+        return
+    # Categoricals are read as strings; numeric columns go through the C float parser
+    yield from pd.read_csv(path, usecols=columns, dtype={c: str for c in categorical},
+                           keep_default_na=False, na_values=[''], chunksize=chunk_size, low_memory=False)
+
+
+class _DictionaryEncoder:
+    def __init__(self):
+        self.codes = {}
+
+    def encode(self, values):
+        local, uniques = pd.factorize(values.astype('string').str.strip().replace('', pd.NA))
+        mapping = np.array([self.codes.setdefault(str(u), len(self.codes)) for u in uniques] + [-1], dtype=np.int32)
+        # factorize marks missing as -1, which indexes the trailing -1
+        return mapping[local]
+
+    def dictionary(self):
+        return list(self.codes)
+
+
+def convert(path, categorical, numeric, cache_dir=CACHE_DIR, chunk_size=CHUNK_SIZE):
+    """Convert `path` into the columnar cache unless already there; returns (directory, converted)."""
+    out_dir = os.path.join(cache_dir, source_key(path, categorical, numeric))
+    if os.path.exists(os.path.join(out_dir, 'meta.json')):
+        return out_dir, False
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=cache_dir, suffix='.tmp')
+    os.chmod(tmp_dir, 0o755)
+    try:
+        encoders = {name: _DictionaryEncoder() for name in categorical}
+        invalid = dict.fromkeys(numeric, 0)
+        files = {name: open(os.path.join(tmp_dir, name + '.bin'), 'wb') for name in list(categorical) + list(numeric)}
+        rows = 0
+        try:
+            for chunk in _read_chunks(path, list(categorical) + list(numeric), categorical, chunk_size):
+                for name in categorical:
+                    encoders[name].encode(chunk[name]).tofile(files[name])
+                for name in numeric:
+                    col = chunk[name]
+                    values = pd.to_numeric(col, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+                    if not pd.api.types.is_numeric_dtype(col):
+                        text = col.astype('string').str.strip()
+                        invalid[name] += int((np.isnan(values) & (text.notna() & (text != '')).to_numpy(bool)).sum())
+                    values.tofile(files[name])
+                rows += len(chunk)
+        finally:
+            for f in files.values():
+                f.close()
+        meta = {
+            'format': FORMAT_VERSION,
+            'source': os.path.abspath(path),
+            'rows': rows,
+            'categorical': {name: enc.dictionary() for name, enc in encoders.items()},
+            'numeric': list(numeric),
+            'invalid': {name: n for name, n in invalid.items() if n},
+        }
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        # Another process may have finished the same conversion first; either copy is identical
+        try:
+            os.replace(tmp_dir, out_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return out_dir, True
+
+
+class ColumnarDataset:
+    """Read-only view of a converted dataset; columns are memory-mapped on access."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.key = os.path.basename(os.path.normpath(directory))
+        with open(os.path.join(directory, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.rows = self.meta['rows']
+        self.categorical = list(self.meta['categorical'])
+        self.numeric = list(self.meta['numeric'])
+
+    def __len__(self):
+        return self.rows
+
+    def _map(self, name, dtype):
+        if not self.rows:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.directory, name + '.bin'), dtype=dtype, mode='r', shape=(self.rows,))
+
+    def column(self, name, start=0, stop=None):
+        if name in self.meta['categorical']:
+            codes = self._map(name, np.int32)[start:stop]
+            return pd.Categorical.from_codes(codes, categories=self.meta['categorical'][name])
+        return self._map(name, np.float64)[start:stop]
+
+    def to_frame(self, columns=None, start=0, stop=None):
+        columns = columns or self.categorical + self.numeric
+        stop = self.rows if stop is None else min(stop, self.rows)
+        data = {name: self.column(name, start, stop) for name in columns}
+        # copy=False keeps the numeric columns as views of the mapped files
+        return pd.DataFrame(data, index=pd.RangeIndex(start, stop), copy=False)
+
+    def chunks(self, chunk_size=CHUNK_SIZE, columns=None):
+        for start in range(0, self.rows, chunk_size):
+            yield self.to_frame(columns, start, start + chunk_size)
+
+    def check(self, categorical_features, numeric_features, labels=(), max_invalid=0.01):
+        """Raise ValueError unless the dataset has the model's columns with usable values."""
+        missing = [c for c in categorical_features if c not in self.meta['categorical']]
+        missing += [c for c in list(numeric_features) + list(labels) if c not in self.numeric]
+        if missing:
+            raise ValueError(f"Dataset is missing columns: {missing}")
+        if not self.rows:
+            raise ValueError('Dataset is empty')
+        bad = {name: n for name, n in self.meta['invalid'].items() if n > max_invalid * self.rows}
+        if bad:
+            raise ValueError(f"Non-numeric values in numeric columns (count per column): {bad}")
+        for label in labels:
+            values = self._map(label, np.float64)
+            if not np.isin(values, (0.0, 1.0)).all():
+                raise ValueError(f"Label column {label!r} must be 0/1 without missing values")
+        return self
+
+
+def open_dataset(path, categorical_features, numeric_features, labels=('risk',), optional=(),
+                 cache_dir=CACHE_DIR, chunk_size=CHUNK_SIZE):
+    """Convert (once) and open `path`, checked against the model's features and labels.
+
+    `optional` label columns (such as the per-condition labels) are kept when
+    the source has them.
+    """
+    available = set(source_columns(path))
+    labels = list(labels) + [c for c in optional if c in available]
+    directory, converted = convert(path, list(categorical_features), list(numeric_features) + labels,
+                                   cache_dir=cache_dir, chunk_size=chunk_size)
+    dataset = ColumnarDataset(directory).check(categorical_features, numeric_features, labels)
+    dataset.converted = converted
+    return dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    conv = sub.add_parser('convert', help='convert a CSV/Parquet file into the columnar cache')
+    conv.add_argument('path')
+    conv.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args()
+
+    from train_model import categorical_features, numeric_features
+    from multihead import HEAD_LABELS
+    dataset = open_dataset(args.path, categorical_features, numeric_features, optional=HEAD_LABELS,
+                           cache_dir=args.cache_dir)
+    print(f"{dataset.rows} rows -> {dataset.directory}")
+    for name, values in dataset.meta['categorical'].items():
+        print(f"  {name}: {len(values)} categories")
+    if dataset.meta['invalid']:
+        print(f"  non-numeric values set to missing: {dataset.meta['invalid']}")
+
+
+if __name__ == '__main__':
+    main()
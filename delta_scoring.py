@@ -0,0 +1,165 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder
+
+
+def _steps(transformer):
+    if isinstance(transformer, Pipeline):
+        return [step for _, step in transformer.steps]
+    return [transformer]
+
+
+def compile_linear(bundle):
+    """Per-feature logit contribution tables for a linear bundle.
+
+    Returns (head names, intercepts, {feature: contribution function}) where each
+    function maps a raw field value to its (n_heads,) logit contribution, mirroring
+    the fitted imputers and one-hot encoder. Raises ValueError for bundles that are
+    not a ColumnTransformer feeding linear heads.
+    """
+    heads = bundle.get('heads')
+    if heads and 'risk' in heads['names']:
+        prep, names = heads['prep'], list(heads['names'])
+        W, b = np.asarray(heads['coef'], dtype=float), np.asarray(heads['intercept'], dtype=float)
+    else:
+        pipeline = bundle['pipeline']
+        model = pipeline.named_steps.get('model')
+        if not isinstance(model, LogisticRegression):
+            raise ValueError('delta scoring needs a linear model')
+        prep, names = pipeline.named_steps['prep'], ['risk']
+        W, b = model.coef_.T.astype(float), model.intercept_.astype(float)
+    if not isinstance(prep, ColumnTransformer):
+        raise ValueError('delta scoring needs a ColumnTransformer preprocessor')
+
+    contributions = {}
+    for name, transformer, columns in prep.transformers_:
+        if transformer == 'drop' or not len(columns):
+            continue
+        block = W[prep.output_indices_[name]]
+        fills = [None] * len(columns)
+        encoder = None
+        for step in ([] if transformer == 'passthrough' else _steps(transformer)):
+            if isinstance(step, SimpleImputer):
+                fills = list(step.statistics_)
+            elif isinstance(step, OneHotEncoder) and step.drop is None:
+                encoder = step
+            elif not (isinstance(step, FunctionTransformer) and step.func is None):
+                raise ValueError(f"delta scoring does not support {type(step).__name__}")
+        offset = 0
+        for j, column in enumerate(columns):
+            if encoder is not None:
+                categories = encoder.categories_[j]
+                table = {value: block[offset + k] for k, value in enumerate(categories)}
+                offset += len(categories)
+                contributions[column] = _categorical(table, fills[j], np.zeros(len(names)))
+            else:
+                contributions[column] = _numeric(block[offset], fills[j])
+                offset += 1
+    return names, b, contributions
+
+
+def _missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _categorical(table, fill, zero):
+    def contribution(value):
+        if _missing(value):
+            value = fill
+        # Unknown categories encode to all zeros (handle_unknown='ignore')
+        return table.get(value, zero)
+    return contribution
+
+
+def _numeric(weights, fill):
+    def contribution(value):
+        if _missing(value):
+            if fill is None:
+                raise ValueError('Input contains NaN')
+            value = fill
+        return weights * float(value)
+    return contribution
+
+
+class SessionScorer:
+    """Incremental re-scoring of a linear bundle for repeat submissions in a session.
+
+    For each session the last raw row, its per-feature logit contributions and the
+    summed logits are kept (LRU-bounded). A resubmission only recomputes the
+    contributions of fields whose value changed (bmi included, since it is derived
+    from height and weight) and adjusts the logits by the difference. A session
+    scored under a different model version is scored in full again.
+    """
+
+    def __init__(self, max_sessions=10000):
+        self.max_sessions = max_sessions
+        self.delta = 0
+        self.full = 0
+        self._compiled = {}
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def supports(self, bundle):
+        return self._compile(bundle) is not None
+
+    def _compile(self, bundle):
+        version = bundle.get('model_version')
+        key = (version, id(bundle))
+        with self._lock:
+            if key in self._compiled:
+                return self._compiled[key]
+        try:
+            compiled = compile_linear(bundle)
+        except (ValueError, KeyError, AttributeError):
+            compiled = None
+        with self._lock:
+            # Only the live version(s) matter; drop tables of replaced bundles
+            self._compiled = {k: v for k, v in self._compiled.items() if k[0] == version}
+            self._compiled[key] = compiled
+        return compiled
+
+    def score(self, bundle, session, row):
+        """{head: probability} for `row`, reusing the session's previous row when possible."""
+        compiled = self._compile(bundle)
+        if compiled is None:
+            raise ValueError('bundle does not support delta scoring')
+        names, intercept, contributions = compiled
+        version = (bundle.get('model_version'), id(bundle))
+
+        with self._lock:
+            state = self._sessions.pop(session, None)
+        if state is not None and state['version'] == version:
+            last, parts, logits = state['row'], state['parts'], state['logits'].copy()
+            for field, fn in contributions.items():
+                value = row.get(field)
+                if value != last.get(field):
+                    new = fn(value)
+                    logits += new - parts[field]
+                    parts[field] = new
+            delta = True
+        else:
+            parts = {field: fn(row.get(field)) for field, fn in contributions.items()}
+            logits = intercept + np.sum(list(parts.values()), axis=0)
+            delta = False
+
+        with self._lock:
+            self._sessions[session] = {'version': version, 'row': dict(row), 'parts': parts, 'logits': logits}
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            if delta:
+                self.delta += 1
+            else:
+                self.full += 1
+        probs = 1.0 / (1.0 + np.exp(-logits))
+        return {name: float(p) for name, p in zip(names, probs)}
+
+    def stats(self):
+        with self._lock:
+            return {'sessions': len(self._sessions), 'delta': self.delta, 'full': self.full}
@@ -0,0 +1,120 @@
+import bisect
+import math
+import threading
+
+import numpy as np
+
+# Conventional PSI bands: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 significant shift
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+
+
+def build_reference(X, categorical_features, numeric_features, bins=10):
+    """Reference sketches saved into the model bundle at training time.
+
+    Numeric features get quantile bin edges from the training data (so every
+    reference bin holds roughly the same mass) plus the counts per bin;
+    categorical features get their vocabulary and counts. Everything is stored as
+    plain lists so the bundle does not depend on this module's classes.
+    """
+    reference = {'numeric': {}, 'categorical': {}, 'rows': int(len(X))}
+    for f in numeric_features:
+        col = X[f].to_numpy(dtype=float)
+        col = col[~np.isnan(col)]
+        edges = np.unique(np.quantile(col, np.linspace(0, 1, bins + 1)[1:-1])) if len(col) else np.array([])
+        counts = np.bincount(np.searchsorted(edges, col, side='right'), minlength=len(edges) + 1)
+        reference['numeric'][f] = {'edges': edges.tolist(), 'counts': counts.tolist()}
+    for f in categorical_features:
+        values = X[f].dropna().astype(str).value_counts()
+        reference['categorical'][f] = {
+            'vocab': values.index.tolist(),
+            'counts': values.tolist() + [0],  # trailing slot counts unseen categories
+        }
+    return reference
+
+
+def psi(expected, actual, eps=1e-4):
+    e = np.asarray(expected, dtype=float)
+    a = np.asarray(actual, dtype=float)
+    e = np.clip(e / max(e.sum(), 1), eps, None)
+    a = np.clip(a / max(a.sum(), 1), eps, None)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def ks(expected, actual):
+    """Two-sample KS statistic evaluated on the shared bin edges."""
+    e = np.asarray(expected, dtype=float)
+    a = np.asarray(actual, dtype=float)
+    if e.sum() == 0 or a.sum() == 0:
+        return 0.0
+    return float(np.max(np.abs(np.cumsum(e) / e.sum() - np.cumsum(a) / a.sum())))
+
+
+class DriftMonitor:
+    """Constant-memory running sketches of the inputs reaching predict().
+
+    Each update touches one fixed-size counter per feature, so memory and time per
+    request do not grow with traffic. Scores compare the live counts against the
+    reference sketches from the bundle.
+    """
+
+    def __init__(self, reference):
+        self.reference = reference
+        self._lock = threading.Lock()
+        self._edges = {f: r['edges'] for f, r in reference['numeric'].items()}
+        self._vocab = {f: {v: i for i, v in enumerate(r['vocab'])}
+                       for f, r in reference['categorical'].items()}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.n = 0
+            self.numeric = {f: [0] * (len(e) + 1) for f, e in self._edges.items()}
+            self.categorical = {f: [0] * (len(v) + 1) for f, v in self._vocab.items()}
+            self.missing = {f: 0 for f in list(self._edges) + list(self._vocab)}
+
+    def update(self, row):
+        with self._lock:
+            self.n += 1
+            for f, edges in self._edges.items():
+                v = row.get(f)
+                if v is None or (isinstance(v, float) and math.isnan(v)):
+                    self.missing[f] += 1
+                else:
+                    self.numeric[f][bisect.bisect_right(edges, v)] += 1
+            for f, vocab in self._vocab.items():
+                v = row.get(f)
+                if v is None or v == '':
+                    self.missing[f] += 1
+                else:
+                    self.categorical[f][vocab.get(v, len(vocab))] += 1
+
+    def report(self):
+        with self._lock:
+            numeric = {f: list(c) for f, c in self.numeric.items()}
+            categorical = {f: list(c) for f, c in self.categorical.items()}
+            missing = dict(self.missing)
+            n = self.n
+
+        features = {}
+        for f, counts in numeric.items():
+            ref = self.reference['numeric'][f]['counts']
+            observed = sum(counts)
+            features[f] = {'type': 'numeric', 'observed': observed, 'missing': missing[f],
+                           'psi': psi(ref, counts) if observed else None,
+                           'ks': ks(ref, counts) if observed else None}
+        for f, counts in categorical.items():
+            ref = self.reference['categorical'][f]['counts']
+            observed = sum(counts)
+            features[f] = {'type': 'categorical', 'observed': observed, 'missing': missing[f],
+                           'psi': psi(ref, counts) if observed else None, 'unseen': counts[-1]}
+        for stats in features.values():
+            if stats['observed'] == 0:
+                stats['status'] = 'no data'
+            elif stats['psi'] >= PSI_SIGNIFICANT:
+                stats['status'] = 'significant'
+            elif stats['psi'] >= PSI_MODERATE:
+                stats['status'] = 'moderate'
+            else:
+                stats['status'] = 'stable'
+        return {'requests': n, 'reference_rows': self.reference['rows'], 'features': features}
@@ -0,0 +1,106 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+METRICS = ('accuracy', 'roc_auc', 'precision', 'recall', 'brier')
+
+# Resamples scored per weight matrix; bounds memory at chunk * n_test floats
+CHUNK_SIZE = 250
+
+
+def resample_weights(rng, n, size):
+    """Bootstrap count matrix of shape (size, n): W[b, i] = times row i was drawn in resample b."""
+    idx = rng.randint(0, n, size=(size, n))
+    idx += (np.arange(size) * n)[:, None]
+    return np.bincount(idx.ravel(), minlength=size * n).reshape(size, n).astype(np.float64)
+
+
+def weighted_metrics(W, y_true, y_prob, threshold=0.5):
+    """Evaluate every metric for each row of the weight matrix W at once."""
+    y = y_true.astype(bool)
+    pred = y_prob >= threshold
+    total = W.sum(axis=1)
+
+    tp = W @ (pred & y)
+    fp = W @ (pred & ~y)
+    fn = W @ (~pred & y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out = {
+            'accuracy': (W @ (pred == y)) / total,
+            'precision': tp / (tp + fp),
+            'recall': tp / (tp + fn),
+            'brier': (W @ (y_prob - y) ** 2) / total,
+            'roc_auc': _weighted_auc(W, y, y_prob),
+        }
+    return out
+
+
+def _weighted_auc(W, y, y_prob):
+    # Mann-Whitney statistic with tied scores grouped: for each distinct score,
+    # positives beat every negative with a lower score and tie with equal ones.
+    order = np.argsort(y_prob, kind='mergesort')
+    scores = y_prob[order]
+    starts = np.flatnonzero(np.r_[True, scores[1:] != scores[:-1]])
+
+    Ws = W[:, order]
+    ys = y[order]
+    pos = np.add.reduceat(Ws * ys, starts, axis=1)
+    neg = np.add.reduceat(Ws * ~ys, starts, axis=1)
+    below = np.cumsum(neg, axis=1) - neg
+
+    num = (pos * (below + 0.5 * neg)).sum(axis=1)
+    return num / (pos.sum(axis=1) * neg.sum(axis=1))
+
+
+def _bootstrap_chunk(y_true, y_prob, threshold, size, seed):
+    rng = np.random.RandomState(seed)
+    W = resample_weights(rng, len(y_true), size)
+    return weighted_metrics(W, y_true, y_prob, threshold)
+
+
+def bootstrap_metrics(y_true, y_prob, threshold=0.5, n_boot=2000, seed=0, confidence=0.95, n_jobs=None):
+    """Point estimates plus percentile bootstrap confidence intervals.
+
+    Resamples are drawn in chunks of CHUNK_SIZE count-weight matrices and spread
+    over a process pool; pass n_jobs=1 to evaluate in-process.
+    """
+    y_true = np.asarray(y_true).astype(np.int8)
+    y_prob = np.asarray(y_prob, dtype=np.float64)
+
+    sizes = [CHUNK_SIZE] * (n_boot // CHUNK_SIZE)
+    if n_boot % CHUNK_SIZE:
+        sizes.append(n_boot % CHUNK_SIZE)
+    seeds = np.random.SeedSequence(seed).generate_state(len(sizes))
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    args = [(y_true, y_prob, threshold, size, int(s)) for size, s in zip(sizes, seeds)]
+    if n_jobs == 1 or len(args) == 1:
+        chunks = [_bootstrap_chunk(*a) for a in args]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(args))) as pool:
+            chunks = list(pool.map(_bootstrap_chunk, *zip(*args)))
+
+    point = weighted_metrics(np.ones((1, len(y_true))), y_true, y_prob, threshold)
+    tail = (1 - confidence) / 2 * 100
+    report = {'n_boot': n_boot, 'confidence': confidence, 'n_test': int(len(y_true))}
+    for name in METRICS:
+        samples = np.concatenate([c[name] for c in chunks])
+        samples = samples[~np.isnan(samples)]
+        low, high = np.percentile(samples, [tail, 100 - tail]) if len(samples) else (np.nan, np.nan)
+        report[name] = {
+            'point': float(point[name][0]),
+            'mean': float(samples.mean()) if len(samples) else float('nan'),
+            'ci_low': float(low),
+            'ci_high': float(high),
+        }
+    return report
+
+
+def format_report(report):
+    pct = int(round(report['confidence'] * 100))
+    lines = [f"{'metric':<10} {'point':>8} {pct}% CI ({report['n_boot']} bootstrap resamples)"]
+    for name in METRICS:
+        m = report[name]
+        lines.append(f"{name:<10} {m['point']:>8.4f} [{m['ci_low']:.4f}, {m['ci_high']:.4f}]")
+    return '\n'.join(lines)
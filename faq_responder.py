@@ -0,0 +1,190 @@
+"""Local TF-IDF responder for common HealthBot questions.
+
+The index is built offline from faq/corpus.json and verified against every
+curated phrasing plus the near-miss questions in faq/checks.json:
+
+    python faq_responder.py build [--corpus faq/corpus.json] [--out faq/index]
+    python faq_responder.py check [--checks faq/checks.json]
+
+and loaded memory-mapped at startup. A lookup only touches the index rows of the
+query's terms, so answering takes well under a millisecond.
+"""
+import argparse
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+
+CORPUS_PATH = 'faq/corpus.json'
+INDEX_DIR = 'faq/index'
+CHECKS_PATH = 'faq/checks.json'
+
+STOPWORDS = frozenset("""
+a an and are am be can do does for how i if in is it me my of on or should so the to what when which
+why with you your much many get im its this that there at by from as per
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Symptoms and wording that must always reach the LLM (or a clinician), never a canned answer
+RED_FLAGS = re.compile(r"""\b(?:
+    chest\W+(?:pain|tight\w*|pressure) | heart\W+attack | stroke | seizure\w* | faint\w* | pass(?:ed|ing)?\W+out |
+    unconscious | numb\w* | paraly\w* | (?:short(?:ness)?\W+of|can\W?t|cannot|trouble)\W+breath\w* |
+    bleed\w* | blood\W+in | vomit\w* | confus\w* | blurr\w* | severe | emergency | dangerous\w* | urgent |
+    suicid\w* | self\W?harm | kill\W+myself | overdos\w* | pregnan\w*
+)\b""", re.X)
+
+
+def red_flag(text):
+    return RED_FLAGS.search(text.lower()) is not None
+
+
+def tokenize(text):
+    tokens = []
+    for tok in _TOKEN.findall(text.lower()):
+        if tok in STOPWORDS:
+            continue
+        # Crude plural folding so "hours"/"hour" and "liters"/"liter" match
+        if len(tok) > 3 and tok.endswith('s') and not tok.endswith('ss'):
+            tok = tok[:-1]
+        tokens.append(tok)
+    return tokens
+
+
+def build_index(corpus_path=CORPUS_PATH, out_dir=INDEX_DIR):
+    """One document per question phrasing, stored term-major as L2-normalised TF-IDF."""
+    with open(corpus_path) as f:
+        corpus = json.load(f)
+
+    docs, doc_entry = [], []
+    for i, entry in enumerate(corpus):
+        for question in entry['questions']:
+            docs.append(Counter(tokenize(question)))
+            doc_entry.append(i)
+
+    vocab = {t: j for j, t in enumerate(sorted({t for d in docs for t in d}))}
+    df = np.zeros(len(vocab))
+    for d in docs:
+        for t in d:
+            df[vocab[t]] += 1
+    idf = np.log((1 + len(docs)) / (1 + df)) + 1.0
+
+    term_doc = np.zeros((len(vocab), len(docs)), dtype=np.float32)
+    for k, d in enumerate(docs):
+        for t, tf in d.items():
+            term_doc[vocab[t], k] = (1 + math.log(tf)) * idf[vocab[t]]
+    term_doc /= np.maximum(np.linalg.norm(term_doc, axis=0, keepdims=True), 1e-12)
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, 'term_doc.npy'), term_doc)
+    np.save(os.path.join(out_dir, 'idf.npy'), idf.astype(np.float32))
+    with open(os.path.join(out_dir, 'meta.json'), 'w') as f:
+        json.dump({
+            'vocab': vocab,
+            'doc_entry': doc_entry,
+            'entries': [{'id': e['id'], 'answer': e['answer'],
+                         'topics': sorted({t for topic in e.get('topics', ()) for t in tokenize(topic)})}
+                        for e in corpus],
+        }, f, indent=1)
+    return len(docs), len(vocab)
+
+
+class FaqIndex:
+    """Memory-mapped TF-IDF index with cosine-similarity lookup and hit-rate counters."""
+
+    def __init__(self, index_dir=INDEX_DIR, threshold=0.6):
+        self.threshold = threshold
+        self.term_doc = np.load(os.path.join(index_dir, 'term_doc.npy'), mmap_mode='r')
+        self.idf = np.load(os.path.join(index_dir, 'idf.npy'), mmap_mode='r')
+        with open(os.path.join(index_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        self.vocab = meta['vocab']
+        self.doc_entry = np.asarray(meta['doc_entry'])
+        self.entries = meta['entries']
+        self.max_idf = float(np.max(self.idf)) if len(self.idf) else 1.0
+        self.lookups = 0
+        self.hits = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+
+    def best_match(self, text):
+        """(entry, cosine score) of the closest curated question, or (None, 0.0)."""
+        tokens = tokenize(text)
+        counts = Counter(t for t in tokens if t in self.vocab)
+        if not counts:
+            return None, 0.0
+        ids = np.fromiter((self.vocab[t] for t in counts), dtype=np.int64)
+        weights = np.fromiter(((1 + math.log(c)) for c in counts.values()), dtype=np.float32) * self.idf[ids]
+        # Unknown query terms weigh as much as the rarest indexed term, so words the
+        # corpus does not cover (symptoms, readings) pull the score down
+        unknown = Counter(t for t in tokens if t not in self.vocab)
+        unknown_weight = sum((1 + math.log(c)) ** 2 for c in unknown.values()) * self.max_idf ** 2
+        norm = math.sqrt(float(weights @ weights) + unknown_weight)
+        scores = (weights @ self.term_doc[ids]) / norm
+        best = int(np.argmax(scores))
+        return self.entries[self.doc_entry[best]], float(scores[best])
+
+    def answer(self, text):
+        """Curated answer when the best match clears the threshold, else None.
+
+        Red-flag wording and readings the corpus does not mention (a number
+        outside the vocabulary, such as "sugar is 300") always fall through.
+        """
+        if red_flag(text) or any(t.isdigit() and t not in self.vocab for t in tokenize(text)):
+            with self._lock:
+                self.lookups += 1
+                self.bypassed += 1
+            return None, 0.0
+        entry, score = self.best_match(text)
+        hit = entry is not None and score >= self.threshold
+        # Generic words ("ok", "drink") can carry the score; the entry's subject must be in the question too
+        if hit and entry.get('topics') and not set(entry['topics']) & set(tokenize(text)):
+            hit = False
+        with self._lock:
+            self.lookups += 1
+            self.hits += int(hit)
+        return (entry, score) if hit else (None, score)
+
+    def hit_rate(self):
+        with self._lock:
+            return self.hits / self.lookups if self.lookups else 0.0
+
+
+def check_index(index, corpus_path=CORPUS_PATH, checks_path=CHECKS_PATH):
+    """Questions answered wrongly: curated phrasings must hit their own entry, near misses must fall through."""
+    with open(corpus_path) as f:
+        expected = [(q, e['id']) for e in json.load(f) for q in e['questions']]
+    with open(checks_path) as f:
+        checks = json.load(f)
+    expected += [(q, entry_id) for entry_id, questions in checks.get('hits', {}).items() for q in questions]
+    expected += [(q, None) for q in checks.get('misses', [])]
+    failures = []
+    for question, entry_id in expected:
+        entry, score = index.answer(question)
+        got = entry['id'] if entry else None
+        if got != entry_id:
+            failures.append((question, entry_id, got, score))
+    return len(expected), failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build or verify the HealthBot FAQ index.')
+    parser.add_argument('command', choices=['build', 'check'])
+    parser.add_argument('--corpus', default=CORPUS_PATH)
+    parser.add_argument('--out', default=INDEX_DIR)
+    parser.add_argument('--checks', default=CHECKS_PATH)
+    parser.add_argument('--threshold', type=float, default=float(os.environ.get('FAQ_THRESHOLD', '0.6')))
+    args = parser.parse_args()
+    if args.command == 'build':
+        n_docs, n_terms = build_index(args.corpus, args.out)
+        print(f"💾 FAQ index built: {n_docs} questions, {n_terms} terms -> '{args.out}'")
+    n_checked, failures = check_index(FaqIndex(args.out, threshold=args.threshold), args.corpus, args.checks)
+    for question, want, got, score in failures:
+        print(f"  ✗ {question!r}: expected {want or 'no answer'}, got {got or 'no answer'} (score {score:.2f})")
+    print(f"🔎 {n_checked - len(failures)}/{n_checked} checks passed")
+    if failures:
+        raise SystemExit(1)
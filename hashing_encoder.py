@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.utils import murmurhash3_32
+
+
+class HashingEncoder(TransformerMixin, BaseEstimator):
+    """One-hot style encoding of categorical columns into `n_features` hashed buckets per column.
+
+    Each value maps to bucket murmurhash3(value) % n_features, so there is no
+    stored vocabulary, the output width is fixed whatever the cardinality, and
+    unseen values need no special handling. Missing values encode as an all-zero
+    row, like OneHotEncoder(handle_unknown='ignore') does for unknown ones.
+    Output is CSR with one stored 1.0 per non-missing cell; only the distinct
+    values of each batch are hashed.
+    """
+
+    def __init__(self, n_features=256, seed=0):
+        self.n_features = n_features
+        self.seed = seed
+
+    def fit(self, X, y=None):
+        X = pd.DataFrame(X)
+        self.n_features_in_ = X.shape[1]
+        if all(isinstance(c, str) for c in X.columns):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        return self
+
+    def _buckets(self, values):
+        codes, uniques = pd.factorize(values)
+        buckets = np.array([murmurhash3_32(str(u), seed=self.seed, positive=True) % self.n_features
+                            for u in uniques] + [-1], dtype=np.int64)
+        # factorize marks missing as -1, which indexes the trailing -1
+        return buckets[codes]
+
+    def transform(self, X):
+        X = pd.DataFrame(X)
+        n = len(X)
+        rows, cols = [], []
+        for j in range(X.shape[1]):
+            buckets = self._buckets(X.iloc[:, j].to_numpy(dtype=object))
+            present = buckets >= 0
+            rows.append(np.flatnonzero(present))
+            cols.append(buckets[present] + j * self.n_features)
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        return sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, X.shape[1] * self.n_features))
+
+    def get_feature_names_out(self, input_features=None):
+        if input_features is None:
+            input_features = getattr(self, 'feature_names_in_', [f"x{j}" for j in range(self.n_features_in_)])
+        return np.asarray([f"{name}_hash{k}" for name in input_features for k in range(self.n_features)],
+                          dtype=object)
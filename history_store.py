@@ -0,0 +1,152 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    risk INTEGER NOT NULL,
+    probability REAL NOT NULL,
+    model TEXT,
+    features TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_user_ts ON predictions (user_id, ts);
+"""
+
+log = logging.getLogger(__name__)
+
+
+class HistoryStore:
+    """Per-user prediction history in SQLite (WAL mode).
+
+    Request handlers only enqueue rows; a single background writer drains the
+    queue and commits them with one executemany per batch. Readers use their own
+    per-thread connections, which WAL lets run concurrently with the writer.
+    """
+
+    def __init__(self, path, batch_size=256, flush_interval=0.5, queue_size=10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self.errors = 0
+        self.lost = 0
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        conn.close()
+
+        threading.Thread(target=self._writer, name='history-writer', daemon=True).start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def record(self, user_id, risk, probability, model=None, features=None, ts=None):
+        item = (str(user_id), ts or time.time(), int(risk), float(probability), model,
+                json.dumps(features) if features is not None else None)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _writer(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                with conn:
+                    conn.executemany(
+                        'INSERT INTO predictions (user_id, ts, risk, probability, model, features) '
+                        'VALUES (?, ?, ?, ?, ?, ?)', batch)
+                self.written += len(batch)
+            except Exception as e:
+                # A failed batch is lost, but the writer keeps draining the queue
+                self.errors += 1
+                self.lost += len(batch)
+                self.last_error = repr(e)
+                log.warning('history write of %d rows failed: %r', len(batch), e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def stats(self):
+        return {
+            'queued': self._queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+            'lost': self.lost,
+            'errors': self.errors,
+            'last_error': self.last_error,
+        }
+
+    def flush(self):
+        """Block until every queued row has been committed."""
+        self._queue.join()
+
+    def query(self, user_id, start=None, end=None, max_points=500):
+        """History for one user in [start, end].
+
+        Ranges holding more than `max_points` rows are downsampled server-side
+        into equal-width time buckets with mean/max probability and risk counts.
+        """
+        start = 0.0 if start is None else float(start)
+        end = time.time() if end is None else float(end)
+        conn = self._reader()
+        params = {'user_id': str(user_id), 'start': start, 'end': end}
+
+        count, first, last = conn.execute(
+            'SELECT COUNT(*), MIN(ts), MAX(ts) FROM predictions '
+            'WHERE user_id = :user_id AND ts BETWEEN :start AND :end', params).fetchone()
+
+        if count <= max_points:
+            rows = conn.execute(
+                'SELECT ts, risk, probability, model, features FROM predictions '
+                'WHERE user_id = :user_id AND ts BETWEEN :start AND :end ORDER BY ts', params).fetchall()
+            points = [{'ts': ts, 'risk': risk, 'probability': prob, 'model': model,
+                       'features': json.loads(features) if features else None}
+                      for ts, risk, prob, model, features in rows]
+            return {'user_id': str(user_id), 'count': count, 'downsampled': False, 'points': points}
+
+        # Bucket over the span actually covered by data, not the (possibly open) request range
+        params['start'], params['end'] = first, last
+        params['width'] = max((last - first) / max_points, 1e-6)
+        params['last_bucket'] = max_points - 1
+        rows = conn.execute(
+            'SELECT MIN(CAST((ts - :start) / :width AS INTEGER), :last_bucket) AS bucket, MIN(ts), MAX(ts), COUNT(*), '
+            'SUM(risk), AVG(probability), MAX(probability) FROM predictions '
+            'WHERE user_id = :user_id AND ts BETWEEN :start AND :end '
+            'GROUP BY bucket ORDER BY bucket', params).fetchall()
+        points = [{'ts': first, 'ts_end': last, 'count': n, 'high_risk': high,
+                   'probability': mean_prob, 'max_probability': max_prob}
+                  for _, first, last, n, high, mean_prob, max_prob in rows]
+        return {'user_id': str(user_id), 'count': count, 'downsampled': True,
+                'bucket_seconds': params['width'], 'points': points}
@@ -0,0 +1,188 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from stage_cache import CACHE_DIR
+from data_profile import format_profile
+
+VALIDATION_CACHE_DIR = os.path.join(CACHE_DIR, 'llm_validation')
+DEFAULT_DEADLINE = float(os.environ.get('LLM_VALIDATION_DEADLINE', '20'))
+
+SYSTEM_PROMPT = "You are a terse data QA assistant."
+PROMPT_PREFIX = (
+    "You are a data QA assistant. Given summary stats of a synthetic health-risk dataset, "
+    "check if feature distributions and correlations look plausible (not exact science). "
+    "Only flag obviously unrealistic patterns. Reply in one short paragraph.\n\n"
+)
+
+
+def summarize(profile):
+    # One line per column from the streaming profile keeps the prompt small
+    return format_profile(profile)[:4000]
+
+
+def openai_backend(prompt, timeout):
+    from openai import OpenAI as _OpenAI
+    client = _OpenAI(api_key=os.environ['OPENAI_API_KEY'], timeout=timeout, max_retries=0)
+    resp = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.0,
+        max_tokens=180,
+    )
+    return resp.choices[0].message.content if resp and resp.choices else "(no validation response)"
+
+
+def fake_backend(prompt, timeout):
+    """Offline stand-in for the LLM: only checks that the summary is non-empty."""
+    lines = prompt[len(PROMPT_PREFIX):].strip().splitlines()
+    if len(lines) < 2:
+        return "(fake) Summary statistics are empty; nothing to validate."
+    return f"(fake) Received {len(lines) - 1} summary rows; no obviously unrealistic patterns checked."
+
+
+BACKENDS = {'openai': openai_backend, 'fake': fake_backend}
+
+
+def get_backend(name=None):
+    """Resolve the backend from LLM_VALIDATION_BACKEND: 'openai' (default), 'fake' or 'off'."""
+    name = (name or os.environ.get('LLM_VALIDATION_BACKEND', 'openai')).lower()
+    if name == 'fake':
+        return fake_backend
+    if name == 'openai' and os.environ.get('OPENAI_API_KEY'):
+        try:
+            import openai  # noqa: F401
+        except Exception:
+            return None
+        return openai_backend
+    return None
+
+
+def _write_json(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+class BackgroundValidation:
+    """Runs the dataset QA prompt in a detached process with a hard deadline.
+
+    Verdicts are cached on disk keyed by a hash of the summary statistics, so an
+    unchanged dataset never triggers a second LLM call. The call runs in its own
+    process (`python llm_validation.py complete ...`) that writes the cache entry
+    itself, so a verdict arriving after training has exited is still kept and
+    reported by the next run. A watcher thread picks it up if it lands sooner.
+    """
+
+    POLL_SECONDS = 0.1
+
+    def __init__(self, profile, backend, deadline=DEFAULT_DEADLINE, cache_dir=VALIDATION_CACHE_DIR):
+        self.backend = backend
+        self.deadline = deadline
+        self.cache_dir = cache_dir
+        self.verdict = None
+        self.error = None
+        self.cached = False
+        self._started = time.monotonic()
+        self._done = threading.Event()
+        # Daemon so a slow backend never keeps the training process alive
+        self._thread = threading.Thread(target=self._run, args=(profile,), name='llm-validation', daemon=True)
+        self._thread.start()
+
+    def _cache_path(self, summary):
+        key = hashlib.sha256(summary.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + '.json')
+
+    def _spawn(self, name, prompt, path):
+        pending = path + '.pending'
+        # A request for the same summary still in flight from an earlier run is waited on, not repeated
+        if os.path.exists(pending) and time.time() - os.path.getmtime(pending) < self.deadline:
+            return
+        _write_json(pending, {'pid': os.getpid()})
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), 'complete', os.path.abspath(path),
+             '--backend', name, '--deadline', str(self.deadline)],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True)
+        proc.stdin.write(prompt.encode('utf-8'))
+        proc.stdin.close()
+
+    def _run(self, profile):
+        try:
+            summary = summarize(profile)
+            path = self._cache_path(summary)
+            if os.path.exists(path):
+                with open(path) as f:
+                    self.verdict = json.load(f)['verdict']
+                self.cached = True
+                return
+
+            name = next((n for n, fn in BACKENDS.items() if fn is self.backend), None)
+            if name is None:
+                # A custom callable cannot be handed to another process; call it on this thread
+                self.verdict = self.backend(PROMPT_PREFIX + summary, self.deadline)
+                _write_json(path, {'verdict': self.verdict})
+                return
+
+            self._spawn(name, PROMPT_PREFIX + summary, path)
+            error_path = path + '.error'
+            while time.monotonic() - self._started < self.deadline:
+                if os.path.exists(path):
+                    with open(path) as f:
+                        self.verdict = json.load(f)['verdict']
+                    return
+                if os.path.exists(error_path):
+                    with open(error_path) as f:
+                        self.error = json.load(f)['error']
+                    os.remove(error_path)
+                    return
+                time.sleep(self.POLL_SECONDS)
+            raise TimeoutError('deadline exceeded')
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block for at most `timeout` seconds, never past the deadline."""
+        remaining = self.deadline - (time.monotonic() - self._started)
+        limit = remaining if timeout is None else min(timeout, remaining)
+        self._done.wait(max(limit, 0))
+        return self.done()
+
+
+def complete(path, backend, deadline, prompt):
+    """Detached half of BackgroundValidation: one backend call, written to the cache as verdict or error."""
+    try:
+        verdict = BACKENDS[backend](prompt, deadline)
+        _write_json(path, {'verdict': verdict})
+    except Exception as e:
+        _write_json(path + '.error', {'error': str(e)})
+    finally:
+        try:
+            os.remove(path + '.pending')
+        except OSError:
+            pass
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Complete one dataset QA request into the verdict cache.')
+    parser.add_argument('command', choices=['complete'])
+    parser.add_argument('path')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), required=True)
+    parser.add_argument('--deadline', type=float, default=DEFAULT_DEADLINE)
+    args = parser.parse_args()
+    complete(args.path, args.backend, args.deadline, sys.stdin.read())
@@ -0,0 +1,201 @@
+import hashlib
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from multihead import MultiHeadScorer
+
+MODES = ('off', 'shadow', 'split')
+
+
+def bundle_frame(bundle, rows):
+    """DataFrame in the column order a bundle's pipeline was trained on."""
+    return pd.DataFrame(rows, columns=bundle['categorical_features'] + bundle['numeric_features'])
+
+
+class LatencyStats:
+    """Call count plus a bounded window of recent latencies for percentiles."""
+
+    def __init__(self, window=2048):
+        self.count = 0
+        self.window = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.count += 1
+        self.window.append(seconds * 1000.0)
+
+    def summary(self):
+        if not self.window:
+            return {'count': self.count}
+        ms = np.fromiter(self.window, dtype=float)
+        return {
+            'count': self.count,
+            'p50_ms': float(np.percentile(ms, 50)),
+            'p99_ms': float(np.percentile(ms, 99)),
+            'mean_ms': float(ms.mean()),
+        }
+
+
+class ModelRouter:
+    """Serves the primary model and optionally a candidate next to it.
+
+    In 'split' mode a share of traffic (sticky per user key when one is given) is
+    served by the candidate. In 'shadow' mode the primary always serves. Either way
+    the model that did not serve a request scores the same row on a background
+    thread, so agreement and score deltas are collected off the response path; when
+    the comparison queue is full, rows are dropped rather than blocking. The
+    background thread drains the queue in micro-batches (up to `batch_size` rows or
+    `linger` seconds) so one vectorised predict_proba call covers many rows and
+    competes less with request threads.
+
+    Bundles with a 'heads' entry are scored through a MultiHeadScorer, so the
+    serving model also returns its per-condition risks from the same transform.
+    With a SessionScorer, primary requests that carry a session key are re-scored
+    incrementally from that session's previous submission.
+    """
+
+    def __init__(self, primary, candidate=None, mode='off', traffic=0.0, queue_size=1000, batch_size=64,
+                 linger=0.25, sessions=None):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self.bundles = {'primary': primary, 'candidate': candidate}
+        self.heads = {name: MultiHeadScorer(bundle['heads']) for name, bundle in self.bundles.items()
+                      if bundle is not None and bundle.get('heads')}
+        self.mode = mode if candidate is not None else 'off'
+        self.traffic = float(traffic)
+        self.sessions = sessions
+        self.batch_size = batch_size
+        self.linger = linger
+        self.latency = {'primary': LatencyStats(), 'candidate': LatencyStats()}
+        self.background = {'primary': LatencyStats(), 'candidate': LatencyStats()}
+        self.compared = 0
+        self.agreed = 0
+        self.dropped = 0
+        self.deltas = deque(maxlen=2048)
+        self.delta_sum = 0.0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        if self.mode != 'off':
+            threading.Thread(target=self._compare_loop, name='model-compare', daemon=True).start()
+
+    def swap(self, name, bundle):
+        """Serve `bundle` as `name` from the next request on; in-flight requests finish on the old one."""
+        scorer = MultiHeadScorer(bundle['heads']) if bundle.get('heads') else None
+        heads = {k: v for k, v in self.heads.items() if k != name}
+        if scorer is not None:
+            heads[name] = scorer
+        self.heads = heads
+        self.bundles = dict(self.bundles, **{name: bundle})
+
+    def choose(self, key=None):
+        if self.mode != 'split':
+            return 'primary'
+        if key:
+            bucket = int(hashlib.sha1(str(key).encode('utf-8')).hexdigest()[:8], 16) % 10000
+            return 'candidate' if bucket < self.traffic * 100 else 'primary'
+        return 'candidate' if random.random() * 100 < self.traffic else 'primary'
+
+    def _score(self, name, row, session=None):
+        bundle = self.bundles[name]
+        scorer = self.heads.get(name)
+        start = time.perf_counter()
+        if session and name == 'primary' and self.sessions is not None and self.sessions.supports(bundle):
+            heads = self.sessions.score(bundle, session, row)
+        elif scorer is not None:
+            heads = scorer.score(bundle_frame(bundle, [row]))
+        else:
+            heads = {}
+        # A logistic primary is itself the 'risk' head; other models still run their pipeline
+        prob = heads.pop('risk', None)
+        if prob is None:
+            prob = float(bundle['pipeline'].predict_proba(bundle_frame(bundle, [row]))[0, 1])
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.latency[name].add(elapsed)
+        return prob, heads
+
+    def score(self, row, key=None, session=None):
+        """Return (model name, positive-class probability, {head: probability}) for the serving model."""
+        served = self.choose(key)
+        prob, heads = self._score(served, row, session)
+        if self.mode != 'off':
+            try:
+                self._queue.put_nowait((served, row, prob))
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+        return served, prob, heads
+
+    def _next_batch(self):
+        # Wait up to `linger` after the first row so bursts are scored together
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _compare_loop(self):
+        while True:
+            batch = self._next_batch()
+            for served in ('primary', 'candidate'):
+                items = [item for item in batch if item[0] == served]
+                if items:
+                    self._compare(served, items)
+
+    def _compare(self, served, items):
+        other = 'candidate' if served == 'primary' else 'primary'
+        bundle = self.bundles[other]
+        start = time.perf_counter()
+        try:
+            other_probs = bundle['pipeline'].predict_proba(bundle_frame(bundle, [row for _, row, _ in items]))[:, 1]
+        except Exception:
+            return
+        per_row = (time.perf_counter() - start) / len(items)
+
+        served_probs = np.array([prob for _, _, prob in items])
+        primary, candidate = ((served_probs, other_probs) if served == 'primary'
+                              else (other_probs, served_probs))
+        delta = candidate - primary
+        with self._lock:
+            self.background[other].add(per_row)
+            self.compared += len(items)
+            self.agreed += int(np.sum((primary > 0.5) == (candidate > 0.5)))
+            self.delta_sum += float(delta.sum())
+            self.deltas.extend(delta.tolist())
+
+    def stats(self):
+        with self._lock:
+            deltas = np.fromiter(self.deltas, dtype=float)
+            out = {
+                'mode': self.mode,
+                'traffic_percent': self.traffic if self.mode == 'split' else None,
+                'latency': {name: s.summary() for name, s in self.latency.items()},
+                # amortised per-row cost of the off-path comparison scoring
+                'background_latency': {name: s.summary() for name, s in self.background.items()},
+                'compared': self.compared,
+                'dropped': self.dropped,
+                'pending': self._queue.qsize(),
+            }
+            if self.sessions is not None:
+                out['session_scoring'] = self.sessions.stats()
+            if self.compared:
+                out['agreement_rate'] = self.agreed / self.compared
+                out['mean_score_delta'] = self.delta_sum / self.compared
+                out['recent_abs_delta_p50'] = float(np.percentile(np.abs(deltas), 50))
+                out['recent_abs_delta_p99'] = float(np.percentile(np.abs(deltas), 99))
+        for name in ('primary', 'candidate'):
+            bundle = self.bundles[name]
+            if bundle is not None:
+                out['latency'][name]['model_version'] = bundle.get('model_version')
+        return out
@@ -0,0 +1,70 @@
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+# Condition-specific labels produced by synthetic.generate next to the overall `risk`
+HEAD_LABELS = ['diabetes_risk', 'cardio_risk', 'lifestyle_risk']
+
+HEAD_TITLES = {
+    'risk': 'Overall risk',
+    'diabetes_risk': 'Diabetes risk',
+    'cardio_risk': 'Cardiovascular risk',
+    'lifestyle_risk': 'Lifestyle risk',
+}
+
+
+def fit_heads(clf, X_train, Y_train, build_preprocessor, C=1.0, max_iter=1000):
+    """Fit one logistic head per label on a single shared, fitted ColumnTransformer.
+
+    When the primary pipeline is logistic its preprocessor and coefficients are
+    reused as the 'risk' head, so one transform + matmul also yields the primary
+    score. Otherwise a one-hot preprocessor is fitted for the extra heads only.
+    """
+    model = clf.named_steps['model']
+    names, coefs, intercepts = [], [], []
+    if isinstance(model, LogisticRegression):
+        prep = clf.named_steps['prep']
+        names.append('risk')
+        coefs.append(model.coef_.ravel())
+        intercepts.append(float(model.intercept_[0]))
+    else:
+        prep = build_preprocessor().fit(X_train)
+
+    Xt = prep.transform(X_train)
+    # Column mean/std of the transformed features, used by online updates to work in standardized units
+    mean = np.asarray(Xt.mean(axis=0)).ravel()
+    sq_mean = np.asarray(Xt.multiply(Xt).mean(axis=0) if hasattr(Xt, 'multiply') else (Xt ** 2).mean(axis=0)).ravel()
+    std = np.sqrt(np.maximum(sq_mean - mean ** 2, 0.0))
+    for label in HEAD_LABELS:
+        head = LogisticRegression(C=C, max_iter=max_iter).fit(Xt, Y_train[label])
+        names.append(label)
+        coefs.append(head.coef_.ravel())
+        intercepts.append(float(head.intercept_[0]))
+
+    return {
+        'prep': prep,
+        'names': names,
+        'coef': np.column_stack(coefs),
+        'intercept': np.asarray(intercepts),
+        'feature_mean': mean,
+        'feature_std': np.where(std > 1e-12, std, 1.0),
+    }
+
+
+class MultiHeadScorer:
+    """Scores every head of a bundle's 'heads' entry from one transformed feature matrix."""
+
+    def __init__(self, heads):
+        self.prep = heads['prep']
+        self.names = list(heads['names'])
+        self.coef = np.asarray(heads['coef'], dtype=float)
+        self.intercept = np.asarray(heads['intercept'], dtype=float)
+
+    def predict_proba(self, X):
+        """(n_rows, n_heads) positive-class probabilities, columns ordered like `names`."""
+        logits = self.prep.transform(X) @ self.coef + self.intercept
+        return 1.0 / (1.0 + np.exp(-np.asarray(logits)))
+
+    def score(self, X):
+        """Head name -> probability for the first row of `X`."""
+        probs = self.predict_proba(X)[0]
+        return {name: float(p) for name, p in zip(self.names, probs)}
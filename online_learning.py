@@ -0,0 +1,187 @@
+import queue
+import threading
+import time
+from collections import deque
+from copy import copy
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+
+LABELS = {'1': 1, '0': 0, 'true': 1, 'false': 0, 'high': 1, 'low': 0}
+
+
+def parse_label(value):
+    """Clinician verdict as 0/1; accepts 0/1, booleans and 'high'/'low'."""
+    label = LABELS.get(str(value).strip().lower())
+    if label is None:
+        raise ValueError("label must be 0/1, true/false or 'high'/'low'")
+    return label
+
+
+def _log_loss(logits, y):
+    return float(np.mean(np.logaddexp(0.0, logits) - y * logits))
+
+
+class OnlineLearner:
+    """Incrementally updates a copy of the primary 'risk' head from clinician feedback.
+
+    Handlers only enqueue (features, label) pairs and never wait. A background
+    thread transforms them in mini-batches with the bundle's fitted preprocessor,
+    sends a `holdout_fraction` share into a bounded holdout buffer and runs
+    SGDClassifier.partial_fit on the rest, in standardized feature units starting
+    from the trained coefficients. After each update the candidate is compared with
+    the serving weights on the holdout buffer by log loss; only when it does not
+    regress is a new bundle built and handed to `publish`.
+    """
+
+    def __init__(self, bundle, publish, holdout_fraction=0.2, holdout_size=1000, min_holdout=50,
+                 batch_size=32, linger=1.0, queue_size=10000, learning_rate=0.01, alpha=1e-5,
+                 tolerance=0.0, seed=0):
+        heads = bundle.get('heads')
+        if not heads or 'risk' not in heads['names'] or 'feature_std' not in heads:
+            raise ValueError('online learning needs a logistic bundle with risk heads; retrain with train_model.py')
+        self.publish = publish
+        self.holdout_fraction = holdout_fraction
+        self.min_holdout = min_holdout
+        self.batch_size = batch_size
+        self.linger = linger
+        self.tolerance = tolerance
+        self.columns = bundle['categorical_features'] + bundle['numeric_features']
+        self.received = 0
+        self.dropped = 0
+        self.trained = 0
+        self.updates = 0
+        self.published = 0
+        self.rejected = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_losses = None
+
+        self._bundle = bundle
+        self._head = heads['names'].index('risk')
+        self._mean = np.asarray(heads['feature_mean'], dtype=float)
+        self._std = np.asarray(heads['feature_std'], dtype=float)
+        # logit = x.w + b = ((x - mean) / std).(w * std) + (b + mean.w)
+        w = np.asarray(heads['coef'], dtype=float)[:, self._head]
+        b = float(heads['intercept'][self._head])
+        self._serving = (w * self._std, b + float(self._mean @ w))
+        self.model = SGDClassifier(loss='log_loss', learning_rate='constant', eta0=learning_rate, alpha=alpha)
+        self.model.coef_ = self._serving[0].reshape(1, -1).copy()
+        self.model.intercept_ = np.array([self._serving[1]])
+        self._holdout = deque(maxlen=holdout_size)
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        threading.Thread(target=self._loop, name='online-learner', daemon=True).start()
+
+    def submit(self, row, label):
+        """Queue one labelled row; returns False (and counts a drop) when the queue is full."""
+        try:
+            self._queue.put_nowait((row, int(label)))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.received += 1
+        return True
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.linger
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._learn(batch)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                    self.last_error = repr(e)
+
+    def _standardize(self, rows):
+        Xt = self._bundle['heads']['prep'].transform(pd.DataFrame(rows, columns=self.columns))
+        Xt = Xt.toarray() if hasattr(Xt, 'toarray') else np.asarray(Xt, dtype=float)
+        return (Xt - self._mean) / self._std
+
+    def _learn(self, batch):
+        X = self._standardize([row for row, _ in batch])
+        y = np.array([label for _, label in batch])
+        held = self._rng.random(len(y)) < self.holdout_fraction
+        self._holdout.extend(zip(X[held], y[held]))
+        if held.all():
+            return
+        self.model.partial_fit(X[~held], y[~held], classes=[0, 1])
+        with self._lock:
+            self.trained += int((~held).sum())
+            self.updates += 1
+        self._maybe_publish()
+
+    def _maybe_publish(self):
+        if len(self._holdout) < self.min_holdout:
+            return
+        Xh = np.vstack([x for x, _ in self._holdout])
+        yh = np.array([label for _, label in self._holdout])
+        w, b = self.model.coef_.ravel(), float(self.model.intercept_[0])
+        candidate = _log_loss(Xh @ w + b, yh)
+        serving = _log_loss(Xh @ self._serving[0] + self._serving[1], yh)
+        with self._lock:
+            self.last_losses = {'candidate': candidate, 'serving': serving, 'holdout': int(len(yh))}
+        if candidate > serving + self.tolerance:
+            with self._lock:
+                self.rejected += 1
+            return
+        self._serving = (w.copy(), b)
+        self._bundle = self._build_bundle(w, b)
+        self.publish(self._bundle)
+        with self._lock:
+            self.published += 1
+
+    def _build_bundle(self, w_std, b_std):
+        # Back to raw feature units so the published pipeline and heads score exactly like a trained bundle
+        w = w_std / self._std
+        b = b_std - float(self._mean @ w)
+        heads = dict(self._bundle['heads'])
+        heads['coef'] = np.array(heads['coef'], dtype=float)
+        heads['coef'][:, self._head] = w
+        heads['intercept'] = np.array(heads['intercept'], dtype=float)
+        heads['intercept'][self._head] = b
+
+        pipeline = self._bundle['pipeline']
+        model = copy(pipeline.named_steps['model'])
+        model.coef_ = w.reshape(1, -1)
+        model.intercept_ = np.array([b])
+        bundle = dict(self._bundle, heads=heads,
+                      pipeline=Pipeline(steps=[('prep', pipeline.named_steps['prep']), ('model', model)]))
+        base_version = str(self._bundle.get('model_version') or 'model').split('+online')[0]
+        bundle['model_version'] = f"{base_version}+online{self.published + 1}"
+        return bundle
+
+    def stats(self):
+        with self._lock:
+            return {
+                'received': self.received,
+                'dropped': self.dropped,
+                'pending': self._queue.qsize(),
+                'trained': self.trained,
+                'holdout': len(self._holdout),
+                'updates': self.updates,
+                'published': self.published,
+                'rejected': self.rejected,
+                'errors': self.errors,
+                'last_error': self.last_error,
+                'last_losses': self.last_losses,
+                'model_version': self._bundle.get('model_version'),
+            }
@@ -0,0 +1,75 @@
+import numpy as np
+
+from population import AGE_BAND_LABELS, age_band, age_band_index
+
+# Cohort definitions from most to least specific; a row uses the first one with enough reference rows
+COHORT_LEVELS = [('age_band', 'gender'), ('age_band',), ()]
+N_QUANTILES = 201
+MIN_COHORT = 200
+
+
+def _cohort_key(fields, values):
+    return '|'.join(f"{f}={v}" for f, v in zip(fields, values)) or 'all'
+
+
+def _cohort_values(field, data):
+    if field == 'age_band':
+        return np.asarray(AGE_BAND_LABELS, dtype=object)[age_band_index(data['age'].to_numpy())]
+    return data[field].astype(str).to_numpy()
+
+
+def build_percentile_tables(data, prob, levels=COHORT_LEVELS, n_quantiles=N_QUANTILES, min_count=MIN_COHORT):
+    """Compact quantile grids of reference risk scores per cohort.
+
+    Each cohort with at least `min_count` rows stores `n_quantiles` evenly spaced
+    quantiles of its scores, so serving needs only a binary search on a short
+    sorted array instead of the reference population.
+    """
+    prob = np.asarray(prob, dtype=float)
+    levels_q = np.linspace(0.0, 1.0, n_quantiles)
+    tables, counts = {}, {}
+    for fields in levels:
+        if fields:
+            columns = [_cohort_values(f, data) for f in fields]
+            keys = np.array([_cohort_key(fields, vals) for vals in zip(*columns)])
+        else:
+            keys = np.full(len(prob), 'all')
+        for key in np.unique(keys):
+            scores = prob[keys == key]
+            if len(scores) >= min_count or not fields:
+                tables[str(key)] = np.quantile(scores, levels_q)
+                counts[str(key)] = int(len(scores))
+    return {'levels': [list(f) for f in levels], 'quantiles': levels_q, 'tables': tables, 'counts': counts}
+
+
+def risk_percentile(percentiles, row, prob):
+    """Share of the row's cohort scoring below `prob`, found by bisecting the cohort's quantile grid."""
+    for fields in percentiles['levels']:
+        try:
+            values = [age_band(row['age']) if f == 'age_band' else str(row[f]) for f in fields]
+        except (KeyError, TypeError, ValueError):
+            continue
+        key = _cohort_key(fields, values)
+        grid = percentiles['tables'].get(key)
+        if grid is not None:
+            break
+    else:
+        return None
+
+    levels_q = percentiles['quantiles']
+    j = int(np.searchsorted(grid, prob, side='right'))
+    if j == 0:
+        share = 0.0
+    elif j == len(grid):
+        share = 1.0
+    else:
+        lo, hi = grid[j - 1], grid[j]
+        frac = (prob - lo) / (hi - lo) if hi > lo else 0.0
+        share = levels_q[j - 1] + frac * (levels_q[j] - levels_q[j - 1])
+    cohort = ', '.join(f"age {v}" if f == 'age_band' else v for f, v in zip(fields, values)) or 'everyone'
+    return {
+        'percentile': round(float(share) * 100, 1),
+        'top_percent': max(round(100.0 - float(share) * 100, 1), 1.0),
+        'cohort': cohort,
+        'cohort_size': percentiles['counts'][key],
+    }
@@ -0,0 +1,73 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+_running = threading.Lock()
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _stack(frame):
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+def profile(seconds, interval=0.005, top_allocations=20):
+    """Sample every other thread's stack for `seconds` while tracemalloc records allocations.
+
+    Returns stacks in the folded "frame;frame;frame count" format that
+    flamegraph.pl and speedscope read, plus the top allocation sites by size.
+    Only one profile can run per process at a time.
+    """
+    if not _running.acquire(blocking=False):
+        raise RuntimeError('a profile is already running in this worker')
+    try:
+        started_tracemalloc = not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start(10)
+        before = tracemalloc.take_snapshot()
+
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        stacks = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stacks[f"{names.get(ident, ident)};{_stack(frame)}"] += 1
+            samples += 1
+            time.sleep(interval)
+
+        after = tracemalloc.take_snapshot()
+        if started_tracemalloc:
+            tracemalloc.stop()
+    finally:
+        _running.release()
+
+    allocations = [
+        {
+            'site': str(stat.traceback[0]),
+            'size_diff_kb': round(stat.size_diff / 1024, 1),
+            'size_kb': round(stat.size / 1024, 1),
+            'count_diff': stat.count_diff,
+        }
+        for stat in after.compare_to(before, 'lineno')[:top_allocations]
+    ]
+    return {
+        'seconds': seconds,
+        'interval_ms': interval * 1000.0,
+        'samples': samples,
+        'folded': '\n'.join(f"{stack} {count}" for stack, count in stacks.most_common()),
+        'top_allocations': allocations,
+    }
@@ -0,0 +1,259 @@
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from synthetic import CATEGORIES
+
+# Physiologically possible values accepted from requests. Deliberately much wider than the
+# generator's synthetic.CLIP_BOUNDS: the extremes are the highest-risk inputs and must be scored
+PLAUSIBLE_RANGES = {
+    'age': (1, 120),
+    'sleep_hours': (0, 24),
+    'water_intake_liters': (0, 15),
+    'height_cm': (50, 272),
+    'weight_kg': (10, 400),
+    'glucose': (10, 2000),
+    'systolic_bp': (50, 300),
+    'diastolic_bp': (20, 200),
+    'sugar': (10, 2000),
+}
+
+# Fields the form marks as required; the lab values may be left blank and are imputed
+REQUIRED_NUMERIC = ('age', 'sleep_hours', 'water_intake_liters', 'height_cm', 'weight_kg')
+
+# A number optionally followed by a unit suffix such as "2.5l", "175 cm" or "82kg"
+_NUMBER = r'^\s*([-+]?(?:\d+\.?\d*|\.\d+))\s*[a-zA-Z/%]*\s*$'
+_NUMBER_RE = re.compile(_NUMBER)
+
+
+class SchemaError(ValueError):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(f"{field}: {message}" for field, message in errors.items()))
+
+
+def build_schema(categorical_features, numeric_features, categories=CATEGORIES, bounds=PLAUSIBLE_RANGES, hashed=()):
+    """Feature schema stored in the bundle: types, allowed categories and plausible ranges.
+
+    Hashed features, and categoricals without a known category list, accept any value.
+    """
+    fields = []
+    for name in categorical_features:
+        if name in hashed or name not in categories:
+            field = {'name': name, 'type': 'categorical', 'categories': None, 'required': True}
+            if name in hashed:
+                field['encoding'] = 'hash'
+            fields.append(field)
+            continue
+        fields.append({'name': name, 'type': 'categorical', 'categories': list(categories[name]), 'required': True})
+    for name in numeric_features:
+        if name == 'bmi':
+            fields.append({'name': name, 'type': 'numeric', 'derived': 'weight_kg / (height_cm / 100) ** 2'})
+            continue
+        lo, hi = bounds.get(name, (None, None))
+        fields.append({'name': name, 'type': 'numeric', 'min': lo, 'max': hi, 'required': name in REQUIRED_NUMERIC})
+    return {'fields': fields}
+
+
+class RowValidator:
+    """Validator/parser compiled from a feature schema, for single rows and DataFrame batches.
+
+    Categorical values must be one of the schema's categories, numeric values may
+    carry a unit suffix and must lie inside the schema's range, and bmi is derived
+    from height and weight. Rejects and unknown categories are counted per field.
+    """
+
+    def __init__(self, schema, categorical_features, numeric_features):
+        self.schema = schema
+        self.columns = list(categorical_features) + list(numeric_features)
+        fields = {f['name']: f for f in schema['fields']}
+        # None: open vocabulary, any non-empty value is accepted
+        self._categorical = [(name, frozenset(fields[name]['categories']) if fields[name].get('categories') else None)
+                             for name in categorical_features]
+        self._numeric = []
+        self._derive_bmi = False
+        for name in numeric_features:
+            field = fields[name]
+            if field.get('derived'):
+                self._derive_bmi = name == 'bmi'
+                continue
+            lo = -np.inf if field.get('min') is None else field['min']
+            hi = np.inf if field.get('max') is None else field['max']
+            self._numeric.append((name, lo, hi, field.get('required', False)))
+        # Height and weight are needed for bmi even when the model does not use them directly
+        if self._derive_bmi:
+            present = {name for name, *_ in self._numeric}
+            for name in ('height_cm', 'weight_kg'):
+                if name not in present:
+                    self._numeric.append((name, *PLAUSIBLE_RANGES[name], True))
+        self.parsed = 0
+        self.rejected = 0
+        self.rejects = Counter()
+        self.unknown = Counter()
+        self._lock = threading.Lock()
+
+    def parse(self, form):
+        """Model row (dict in bundle column order) from form/JSON values; raises SchemaError."""
+        get = form.get
+        row, errors, unknown = {}, {}, []
+        for name, allowed in self._categorical:
+            value = get(name)
+            value = '' if value is None else str(value).strip()
+            if value and (allowed is None or value in allowed):
+                row[name] = value
+            elif not value:
+                errors[name] = 'required'
+            else:
+                errors[name] = f"unknown category {value!r}; expected one of {sorted(allowed)}"
+                unknown.append(name)
+        for name, lo, hi, required in self._numeric:
+            raw = get(name)
+            if isinstance(raw, (int, float)) and not isinstance(raw, bool):
+                value = float(raw)
+            else:
+                text = '' if raw is None else str(raw)
+                match = _NUMBER_RE.match(text)
+                if match is None:
+                    if text.strip():
+                        errors[name] = f"not a number: {text.strip()!r}"
+                    elif required:
+                        errors[name] = 'required'
+                    else:
+                        row[name] = None
+                    continue
+                value = float(match.group(1))
+            if not lo <= value <= hi:
+                errors[name] = f"must be between {lo:g} and {hi:g}"
+                continue
+            row[name] = value
+        if errors:
+            self._count(1, errors, unknown)
+            raise SchemaError(errors)
+        if self._derive_bmi:
+            h_m = row['height_cm'] / 100.0
+            row['bmi'] = round(row['weight_kg'] / (h_m * h_m), 1)
+        with self._lock:
+            self.parsed += 1
+        return {name: row.get(name) for name in self.columns}
+
+    def parse_batch(self, frame):
+        """Vectorised parse of raw rows: (model-ready DataFrame, per-row error messages, '' when valid).
+
+        Rejected rows are kept in the output frame (with missing values) so row
+        positions line up with the input; callers must not score them.
+        """
+        n = len(frame)
+        errors = np.full(n, '', dtype=object)
+        out = {}
+        rejects, unknown = Counter(), Counter()
+
+        def flag(mask, name, message):
+            mask = np.asarray(mask, dtype=bool)
+            if mask.any():
+                errors[mask] += f"{name}: {message}; "
+                rejects[name] += int(mask.sum())
+
+        for name, allowed in self._categorical:
+            if name not in frame:
+                raise SchemaError({name: 'missing column'})
+            col = frame[name].astype('string').str.strip()
+            missing = (col.isna() | (col == '')).to_numpy(dtype=bool)
+            if allowed is None:
+                bad = np.zeros(n, dtype=bool)
+            else:
+                bad = ~missing & ~col.isin(allowed).to_numpy(dtype=bool)
+            flag(missing, name, 'required')
+            flag(bad, name, 'unknown category')
+            unknown[name] += int(bad.sum())
+            values = col.to_numpy(dtype=object, na_value=None)
+            values[missing | bad] = None
+            out[name] = values
+
+        for name, lo, hi, required in self._numeric:
+            if name not in frame:
+                if required:
+                    raise SchemaError({name: 'missing column'})
+                out[name] = np.full(n, np.nan)
+                continue
+            col = frame[name]
+            if pd.api.types.is_numeric_dtype(col):
+                values = col.to_numpy(dtype=float, na_value=np.nan)
+                blank = np.isnan(values)
+                bad = np.zeros(n, dtype=bool)
+            else:
+                text = col.astype('string').str.strip()
+                blank = (text.isna() | (text == '')).to_numpy(dtype=bool)
+                values = pd.to_numeric(text.str.extract(_NUMBER, expand=False), errors='coerce').to_numpy(
+                    dtype=float, na_value=np.nan)
+                bad = ~blank & np.isnan(values)
+            flag(bad, name, 'not a number')
+            if required:
+                flag(blank, name, 'required')
+            with np.errstate(invalid='ignore'):
+                out_of_range = ~np.isnan(values) & ((values < lo) | (values > hi))
+            flag(out_of_range, name, f"must be between {lo:g} and {hi:g}")
+            values[out_of_range | bad] = np.nan
+            out[name] = values
+
+        if self._derive_bmi:
+            h_m = out['height_cm'] / 100.0
+            out['bmi'] = np.round(out['weight_kg'] / (h_m * h_m), 1)
+
+        valid = errors == ''
+        with self._lock:
+            self.parsed += int(valid.sum())
+            self.rejected += int((~valid).sum())
+            self.rejects.update(rejects)
+            self.unknown.update(unknown)
+        errors[~valid] = np.array([e.rstrip('; ') for e in errors[~valid]], dtype=object)
+        return pd.DataFrame({name: out[name] for name in self.columns}), errors
+
+    def check_values(self, name, values):
+        """Cleaned copy of alternative values for one field (what-if axes); raises SchemaError naming the field."""
+        allowed = dict(self._categorical)
+        bounds = {field: (lo, hi) for field, lo, hi, _ in self._numeric}
+        cleaned, bad, unknown = [], [], []
+        for value in values:
+            if name in allowed:
+                text = '' if value is None else str(value).strip()
+                ok = bool(text) and (allowed[name] is None or text in allowed[name])
+                if text and not ok:
+                    unknown = [name]
+                if ok:
+                    cleaned.append(text)
+                    continue
+            else:
+                lo, hi = bounds.get(name, (-np.inf, np.inf))
+                ok = (isinstance(value, (int, float)) and not isinstance(value, bool)
+                      and not np.isnan(value) and lo <= value <= hi)
+                if ok:
+                    cleaned.append(float(value))
+                    continue
+            bad.append(value)
+        if bad:
+            if name in allowed:
+                expected = 'a non-empty value' if allowed[name] is None else f"one of {sorted(allowed[name])}"
+                message = f"invalid values {bad[:5]}; expected {expected}"
+            else:
+                message = f"values {bad[:5]} must be numbers between {lo:g} and {hi:g}"
+            self._count(1, {name: message}, unknown)
+            raise SchemaError({f"vary.{name}": message})
+        return cleaned
+
+    def _count(self, n, errors, unknown):
+        with self._lock:
+            self.rejected += n
+            self.rejects.update(errors.keys())
+            self.unknown.update(unknown)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'parsed': self.parsed,
+                'rejected': self.rejected,
+                'rejects_by_field': dict(self.rejects),
+                'unknown_categories_by_field': dict(self.unknown),
+            }
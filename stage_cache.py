@@ -0,0 +1,82 @@
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import time
+
+import joblib
+
+CACHE_DIR = os.environ.get('STAGE_CACHE_DIR', '.stage_cache')
+
+
+def fingerprint(obj):
+    """Stable sha256 of a JSON-serialisable description of stage inputs."""
+    payload = json.dumps(obj, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+def code_version(*fns):
+    """Hash of the source of the functions a stage executes."""
+    h = hashlib.sha256()
+    for fn in fns:
+        h.update(inspect.getsource(fn).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+class StageResult:
+    def __init__(self, name, key, artifact_hash, value, cached, seconds):
+        self.name = name
+        self.key = key
+        self.artifact_hash = artifact_hash
+        self.value = value
+        self.cached = cached
+        self.seconds = seconds
+
+
+class StageCache:
+    """Content-addressed store for pipeline stage outputs.
+
+    A stage's key covers its params, the source of the code it runs and the
+    artifact hashes of its upstream stages, so a stage is only re-executed when
+    something it depends on actually changed.
+    """
+
+    def __init__(self, root=CACHE_DIR, enabled=True):
+        self.root = root
+        self.enabled = enabled
+
+    def _path(self, name, key):
+        return os.path.join(self.root, name, key + '.joblib')
+
+    def run(self, name, fn, params=None, upstream=(), code=None):
+        upstream = list(upstream)
+        key = fingerprint({
+            'stage': name,
+            'code': code or code_version(fn),
+            'params': params or {},
+            'upstream': [u.artifact_hash for u in upstream],
+        })
+        path = self._path(name, key)
+        start = time.perf_counter()
+
+        if self.enabled and os.path.exists(path):
+            value = joblib.load(path)
+            return StageResult(name, key, file_hash(path), value, True, time.perf_counter() - start)
+
+        value = fn(*[u.value for u in upstream], **(params or {}))
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+        joblib.dump(value, tmp)
+        os.replace(tmp, path)
+        return StageResult(name, key, file_hash(path), value, False, time.perf_counter() - start)
@@ -0,0 +1,76 @@
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """Records how long each startup phase and top-level import takes.
+
+    Import timing wraps builtins.__import__ and only attributes time to the
+    outermost import of a module that was not loaded yet, so nested imports are
+    counted once, under the package that pulled them in.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.steps = []
+        self.ready_after = None
+        self.imports = {}
+        self._original_import = None
+        self._local = threading.local()
+
+    def start_import_timing(self):
+        if not self.enabled or self._original_import is not None:
+            return
+        original = self._original_import = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            depth = getattr(self._local, 'depth', 0)
+            if depth or level or name in sys.modules:
+                self._local.depth = depth + 1
+                try:
+                    return original(name, globals, locals, fromlist, level)
+                finally:
+                    self._local.depth = depth
+            self._local.depth = 1
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._local.depth = 0
+                self.imports[name] = self.imports.get(name, 0.0) + time.perf_counter() - start
+
+        builtins.__import__ = timed_import
+
+    def stop_import_timing(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    @contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - start))
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def mark_ready(self):
+        self.ready_after = self.elapsed()
+
+    def report(self, top=15):
+        lines = ['Startup profile:']
+        for name, seconds in self.steps:
+            lines.append(f"  {name:<32} {seconds * 1000:9.1f} ms")
+        if self.imports:
+            lines.append('  slowest imports:')
+            for name, seconds in sorted(self.imports.items(), key=lambda kv: -kv[1])[:top]:
+                lines.append(f"    {name:<30} {seconds * 1000:9.1f} ms")
+        lines.append(f"  {'total':<32} {self.elapsed() * 1000:9.1f} ms")
+        return '\n'.join(lines)
@@ -0,0 +1,82 @@
+"""Fit the training preprocessor from bounded-memory column states instead of whole columns.
+
+The imputers and encoders only need a median per numeric column, a mode per
+categorical column and each categorical's vocabulary. Those come from a
+DataProfile built one chunk at a time (a quantile sketch for the median,
+frequency counts for the mode and vocabulary), so the data never has to be in
+memory at once. The usual ColumnTransformer is then fitted on a single seed row
+holding those statistics, with the vocabularies passed as explicit categories,
+which leaves plain SimpleImputer / OneHotEncoder / OrdinalEncoder objects in the
+bundle, exactly as the in-memory fit does.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
+
+from data_profile import CHUNK_SIZE, DataProfile
+
+
+def profile_chunks(chunks, columns):
+    profile = DataProfile()
+    for chunk in chunks:
+        profile.update(chunk[columns])
+    return profile
+
+
+def frame_chunks(data, chunk_size=CHUNK_SIZE):
+    for start in range(0, len(data), chunk_size):
+        yield data.iloc[start:start + chunk_size]
+
+
+def _median(column):
+    if not column.count:
+        return np.nan
+    sketch = column.sketch
+    # Until the first compaction the sketch holds every value, so the median is exact
+    if len(sketch.levels) == 1:
+        return float(np.median(sketch.levels[0]))
+    return sketch.quantiles([0.5])[0]
+
+
+def _mode(column):
+    if not column.counts:
+        return np.nan
+    # Ties go to the smallest value, as in SimpleImputer(strategy='most_frequent')
+    return min(column.counts, key=lambda value: (-column.counts[value], value))
+
+
+def seed_frame(profile, categorical_features, numeric_features):
+    """(one-row frame of per-column modes/medians, {categorical: sorted vocabulary})."""
+    columns = profile.columns
+    row = {name: _mode(columns[name]) for name in categorical_features}
+    row.update({name: _median(columns[name]) for name in numeric_features})
+    seed = pd.DataFrame([row], columns=list(categorical_features) + list(numeric_features))
+    seed[list(categorical_features)] = seed[list(categorical_features)].astype(object)
+    categories = {name: sorted(columns[name].counts) for name in categorical_features}
+    return seed, categories
+
+
+def _set_categories(transformer, categories):
+    steps = [step for _, step in transformer.steps] if isinstance(transformer, Pipeline) else [transformer]
+    for step in steps:
+        if isinstance(step, (OneHotEncoder, OrdinalEncoder)):
+            step.set_params(categories=categories)
+
+
+def fit_preprocessor(prep, chunks, categorical_features, numeric_features):
+    """Fit a ColumnTransformer (as built by train_model) from an iterable of DataFrame chunks."""
+    profile = profile_chunks(chunks, list(categorical_features) + list(numeric_features))
+    seed, categories = seed_frame(profile, categorical_features, numeric_features)
+    for name, transformer, columns in prep.transformers:
+        if columns and all(c in categories for c in columns):
+            _set_categories(transformer, [categories[c] for c in columns])
+    return prep.fit(seed)
+
+
+def fit_pipeline(pipeline, X, y, categorical_features, numeric_features, chunk_size=CHUNK_SIZE):
+    """Fit `pipeline` with its 'prep' step fitted from chunk states, then the model on the transformed rows."""
+    prep = fit_preprocessor(pipeline.named_steps['prep'], frame_chunks(X, chunk_size),
+                            categorical_features, numeric_features)
+    pipeline.named_steps['model'].fit(prep.transform(X), y)
+    return pipeline
@@ -0,0 +1,261 @@
+"""Correlated synthetic health-risk population generator.
+
+Used by train_model.py to build the training set and by population.py to
+simulate cohorts under scenario overrides of the parameters below.
+"""
+import numpy as np
+import pandas as pd
+
+CATEGORIES = {
+    'gender': ['Male', 'Female', 'Other'],
+    'body_type': ['Slim', 'Average', 'Overweight'],
+    'diet_type': ['Vegetarian', 'Mixed', 'Fast-food lover'],
+    'physical_activity': ['Rarely', 'Sometimes', 'Regularly'],
+    'family_history': ['None', 'Diabetes', 'Heart Issues'],
+    'stress_level': ['Low', 'Medium', 'High'],
+    'smoking': ['Yes', 'No'],
+    'alcohol': ['Yes', 'No'],
+    'junk_food_freq': ['Rarely', 'Weekly', 'Daily'],
+}
+
+# Plausible ranges; the generator clips to these bounds
+CLIP_BOUNDS = {
+    'age': (18, 79),
+    'sleep_hours': (3.5, 10.0),
+    'water_intake_liters': (0.8, 5.5),
+    'height_cm': (145.0, 205.0),
+    'weight_kg': (40.0, 160.0),
+    'glucose': (60.0, 220.0),
+    'systolic_bp': (90.0, 200.0),
+    'diastolic_bp': (55.0, 120.0),
+    'sugar': (70.0, 260.0),
+}
+
+# Probability vectors follow the CATEGORIES order; 'smoking_p'/'alcohol_p' are P(Yes)
+DEFAULT_PARAMS = {
+    'gender_p': [0.48, 0.50, 0.02],
+    'body_type_p_over50': [0.15, 0.45, 0.40],
+    'body_type_p_under50': [0.30, 0.55, 0.15],
+    'diet_type_p': [0.3, 0.45, 0.25],
+    'activity_p_overweight': [0.45, 0.45, 0.10],
+    'activity_p_other': [0.20, 0.55, 0.25],
+    'smoking_p': 0.18,
+    'alcohol_p': 0.30,
+    'sleep_mean': 7.0,
+    'family_history_p_over50': [0.45, 0.35, 0.20],
+    'family_history_p_under50': [0.60, 0.25, 0.15],
+    'stress_level_p': [0.35, 0.45, 0.20],
+    'water_mean': 2.8,
+    'junk_food_p_fastfood': [0.15, 0.40, 0.45],
+    'junk_food_p_other': [0.55, 0.35, 0.10],
+    'height_mean_m': 1.65,
+    'weight_mean': 65.0,
+    'glucose_mean': 95.0,
+    'systolic_mean': 120.0,
+    'diastolic_mean': 80.0,
+    'sugar_mean': 110.0,
+}
+
+
+def apply_scenario(overrides, params=DEFAULT_PARAMS):
+    """Return a copy of `params` with scenario overrides applied.
+
+    Each override is either a replacement value, {'scale': x} or {'shift': x}.
+    For example "25% fewer smokers" is {'smoking_p': {'scale': 0.75}} and
+    "average sleep +1h" is {'sleep_mean': {'shift': 1}}.
+    """
+    if overrides and not isinstance(overrides, dict):
+        raise ValueError('scenario must be an object mapping parameters to overrides')
+    out = {k: list(v) if isinstance(v, list) else v for k, v in params.items()}
+    for key, value in (overrides or {}).items():
+        if key not in out:
+            raise ValueError(f"unknown scenario parameter: {key}")
+        current = out[key]
+        if isinstance(value, dict):
+            if isinstance(current, list):
+                raise ValueError(f"{key} is a probability vector; pass a full list instead")
+            if 'scale' in value:
+                current = current * float(value['scale'])
+            if 'shift' in value:
+                current = current + float(value['shift'])
+            value = current
+        if isinstance(current, list):
+            if not isinstance(value, list) or len(value) != len(current):
+                raise ValueError(f"{key} must be a list of {len(current)} probabilities")
+            value = [float(v) for v in value]
+            if min(value) < 0 or abs(sum(value) - 1.0) > 1e-6:
+                raise ValueError(f"{key} probabilities must be non-negative and sum to 1")
+        else:
+            value = float(value)
+            if key.endswith('_p') and not 0.0 <= value <= 1.0:
+                raise ValueError(f"{key} must be a probability between 0 and 1")
+        out[key] = value
+    return out
+
+
+def generate(n, rng, params=DEFAULT_PARAMS):
+    """Generate `n` correlated rows: features, the binary `risk` label and per-condition labels."""
+    p = params
+    C = CATEGORIES
+
+    age = rng.randint(18, 80, n)
+    gender = rng.choice(C['gender'], n, p=p['gender_p'])
+
+    # Age affects body type probability slightly
+    body_type = np.where(
+        age > 50,
+        rng.choice(C['body_type'], n, p=p['body_type_p_over50']),
+        rng.choice(C['body_type'], n, p=p['body_type_p_under50'])
+    )
+
+    diet_type = rng.choice(C['diet_type'], n, p=p['diet_type_p'])
+
+    # Physical activity linked with body type
+    physical_activity = np.where(
+        body_type == 'Overweight',
+        rng.choice(C['physical_activity'], n, p=p['activity_p_overweight']),
+        rng.choice(C['physical_activity'], n, p=p['activity_p_other'])
+    )
+
+    # Smoking/alcohol influence sleep
+    smoking = rng.choice(C['smoking'], n, p=[p['smoking_p'], 1 - p['smoking_p']])
+    alcohol = rng.choice(C['alcohol'], n, p=[p['alcohol_p'], 1 - p['alcohol_p']])
+
+    sleep_hours = np.clip(
+        rng.normal(p['sleep_mean'] - (smoking == 'Yes') * 0.8 - (alcohol == 'Yes') * 0.5, 1.1, n),
+        *CLIP_BOUNDS['sleep_hours']
+    )
+
+    family_history = np.where(
+        age > 50,
+        rng.choice(C['family_history'], n, p=p['family_history_p_over50']),
+        rng.choice(C['family_history'], n, p=p['family_history_p_under50'])
+    )
+
+    stress_level = rng.choice(C['stress_level'], n, p=p['stress_level_p'])
+
+    # Correlated with diet and stress
+    water_intake_liters = np.clip(
+        rng.normal(p['water_mean'] - (stress_level == 'High') * 0.6 - (diet_type == 'Fast-food lover') * 0.5, 0.8, n),
+        *CLIP_BOUNDS['water_intake_liters']
+    )
+
+    junk_food_freq = np.where(
+        diet_type == 'Fast-food lover',
+        rng.choice(C['junk_food_freq'], n, p=p['junk_food_p_fastfood']),
+        rng.choice(C['junk_food_freq'], n, p=p['junk_food_p_other'])
+    )
+
+    # Height (m) and Weight (kg) to derive BMI
+    height_m = np.clip(rng.normal(p['height_mean_m'], 0.1, n), 1.45, 2.05)
+    weight_kg = np.clip(
+        rng.normal(p['weight_mean'], 12, n)
+        + (diet_type == 'Fast-food lover') * 5
+        - (physical_activity == 'Regularly') * 3,
+        *CLIP_BOUNDS['weight_kg']
+    )
+    bmi = np.round(weight_kg / (height_m ** 2), 1)
+
+    # Clinical labs (simulate fasting glucose mg/dL and an additional sugar marker e.g., random glucose)
+    glucose = np.clip(
+        rng.normal(p['glucose_mean'] + (age > 45) * 10 + (family_history == 'Diabetes') * 15, 15, n),
+        *CLIP_BOUNDS['glucose']
+    )
+    systolic_bp = np.clip(
+        rng.normal(p['systolic_mean'] + (age > 50) * 15 + (bmi > 28) * 10, 12, n),
+        *CLIP_BOUNDS['systolic_bp']
+    )
+    diastolic_bp = np.clip(
+        rng.normal(p['diastolic_mean'] + (bmi > 28) * 5, 8, n),
+        *CLIP_BOUNDS['diastolic_bp']
+    )
+    Sugar_random = np.clip(
+        rng.normal(p['sugar_mean'] + (diet_type == 'Fast-food lover') * 10 + (stress_level == 'High') * 8, 20, n),
+        *CLIP_BOUNDS['sugar']
+    )
+
+    data = pd.DataFrame({
+        'age': age,
+        'gender': gender,
+        'body_type': body_type,
+        'diet_type': diet_type,
+        'physical_activity': physical_activity,
+        'sleep_hours': np.round(sleep_hours, 1),
+        'smoking': smoking,
+        'alcohol': alcohol,
+        'family_history': family_history,
+        'stress_level': stress_level,
+        'water_intake_liters': np.round(water_intake_liters, 1),
+        'junk_food_freq': junk_food_freq,
+        'bmi': np.round(bmi, 1),
+        'height_cm': np.round(height_m * 100.0, 1),
+        'weight_kg': np.round(weight_kg, 1),
+        'glucose': np.round(glucose, 1),
+        'systolic_bp': np.round(systolic_bp, 1),
+        'diastolic_bp': np.round(diastolic_bp, 1),
+        'sugar': np.round(Sugar_random, 1),
+    })
+
+    # Generate synthetic risk score with realistic influence
+    risk_score = (
+        (age > 55).astype(int) * 0.8 +
+        (body_type == 'Overweight').astype(int) * 0.9 +
+        (bmi > 27).astype(int) * 0.7 +
+        (diet_type == 'Fast-food lover').astype(int) * 0.8 +
+        (physical_activity == 'Rarely').astype(int) * 0.9 +
+        (sleep_hours < 6).astype(int) * 0.6 +
+        (smoking == 'Yes').astype(int) * 0.9 +
+        (alcohol == 'Yes').astype(int) * 0.4 +
+        (family_history != 'None').astype(int) * 0.8 +
+        (stress_level == 'High').astype(int) * 0.7 +
+        (water_intake_liters < 2).astype(int) * 0.5 +
+        (junk_food_freq == 'Daily').astype(int) * 0.7 +
+        (glucose > 130).astype(int) * 1.0 +
+        (systolic_bp > 140).astype(int) * 0.7 +
+        (diastolic_bp > 90).astype(int) * 0.6 +
+        (data['sugar'] > 160).astype(int) * 0.6
+    )
+
+    # Convert score to probability and then binary label
+    noise = rng.normal(0, 0.3, n)
+    prob = 1 / (1 + np.exp(-(risk_score + noise - 1.6)))
+    risk = (rng.rand(n) < prob).astype(int)
+
+    data['risk'] = risk
+
+    # Condition-specific labels for the multi-head model. They are drawn after the
+    # overall label so the columns above stay identical for a given seed.
+    diabetes_score = (
+        (glucose > 126).astype(int) * 1.4 +
+        (data['sugar'] > 180).astype(int) * 0.8 +
+        (family_history == 'Diabetes').astype(int) * 1.0 +
+        (bmi > 30).astype(int) * 0.9 +
+        (age > 45).astype(int) * 0.5 +
+        (physical_activity == 'Rarely').astype(int) * 0.5 +
+        (diet_type == 'Fast-food lover').astype(int) * 0.4
+    )
+    cardio_score = (
+        (systolic_bp > 140).astype(int) * 1.2 +
+        (diastolic_bp > 90).astype(int) * 0.8 +
+        (family_history == 'Heart Issues').astype(int) * 1.0 +
+        (smoking == 'Yes').astype(int) * 0.9 +
+        (age > 55).astype(int) * 0.8 +
+        (bmi > 30).astype(int) * 0.5 +
+        (stress_level == 'High').astype(int) * 0.4
+    )
+    lifestyle_score = (
+        (sleep_hours < 6).astype(int) * 0.8 +
+        (water_intake_liters < 2).astype(int) * 0.6 +
+        (junk_food_freq == 'Daily').astype(int) * 0.9 +
+        (alcohol == 'Yes').astype(int) * 0.6 +
+        (physical_activity == 'Rarely').astype(int) * 1.0 +
+        (smoking == 'Yes').astype(int) * 0.8 +
+        (stress_level == 'High').astype(int) * 0.6
+    )
+    for name, score, offset in (('diabetes_risk', diabetes_score, 1.8),
+                                ('cardio_risk', cardio_score, 1.8),
+                                ('lifestyle_risk', lifestyle_score, 1.5)):
+        head_prob = 1 / (1 + np.exp(-(score + rng.normal(0, 0.3, n) - offset)))
+        data[name] = (rng.rand(n) < head_prob).astype(int)
+
+    return data
@@ -0,0 +1,169 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import joblib
+
+from model_router import LatencyStats, ModelRouter
+from schema import RowValidator, build_schema
+
+# Tenant keys become directory names, so only plain identifiers are accepted
+TENANT_ID = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$')
+
+
+class UnknownTenant(LookupError):
+    pass
+
+
+class TenantModel:
+    """One tenant's loaded bundle with its router and request validator."""
+
+    def __init__(self, tenant, path, bundle):
+        self.tenant = tenant
+        self.path = path
+        self.bundle = bundle
+        self.router = ModelRouter(bundle)
+        cat, num = bundle['categorical_features'], bundle['numeric_features']
+        self.validator = RowValidator(bundle.get('schema') or build_schema(cat, num), cat, num)
+        stat = os.stat(path)
+        self.mtime = stat.st_mtime
+        # On-disk size of the pickle as the estimate of its resident size (arrays dominate both)
+        self.bytes = stat.st_size
+        self.checked = time.monotonic()
+
+
+class TenantStats:
+    def __init__(self):
+        self.loads = 0
+        self.hits = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.load = LatencyStats(window=256)
+        self.score = LatencyStats()
+
+    def summary(self):
+        return {
+            'loads': self.loads,
+            'hits': self.hits,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'load_latency': self.load.summary(),
+            'score_latency': self.score.summary(),
+        }
+
+
+class TenantModels:
+    """Lazily loaded per-tenant bundles (`<model_dir>/<tenant>/model.pkl`) in an LRU bounded by memory.
+
+    A tenant's bundle is loaded on its first request and kept while the total
+    estimated size of resident bundles stays under `max_bytes`; beyond that the
+    least recently used tenants are evicted. Concurrent first requests for the
+    same tenant wait on a single load instead of each unpickling the file. Every
+    `refresh_interval` seconds a hit checks the file's mtime, so a retrained
+    bundle is picked up without a restart.
+    """
+
+    def __init__(self, model_dir, max_bytes=1 << 30, filename='model.pkl', refresh_interval=30.0):
+        self.model_dir = model_dir
+        self.max_bytes = max_bytes
+        self.filename = filename
+        self.refresh_interval = refresh_interval
+        self.resident_bytes = 0
+        self._models = OrderedDict()
+        self._loading = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def path(self, tenant):
+        if not TENANT_ID.match(tenant or ''):
+            raise UnknownTenant(f"invalid tenant id {tenant!r}")
+        return os.path.join(self.model_dir, tenant, self.filename)
+
+    def _fresh(self, model):
+        if time.monotonic() - model.checked < self.refresh_interval:
+            return True
+        try:
+            changed = os.stat(model.path).st_mtime != model.mtime
+        except OSError:
+            changed = False
+        model.checked = time.monotonic()
+        return not changed
+
+    def get(self, tenant):
+        path = self.path(tenant)
+        with self._lock:
+            model = self._models.get(tenant)
+            if model is not None and self._fresh(model):
+                self._models.move_to_end(tenant)
+                self._stats[tenant].hits += 1
+                return model
+            future = self._loading.get(tenant)
+            owner = future is None
+            if owner:
+                future = self._loading[tenant] = Future()
+                future.waiters = 0
+            else:
+                future.waiters += 1
+        if not owner:
+            return future.result()
+        try:
+            model = self._load(tenant, path)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[tenant]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._loading[tenant]
+            self._stats[tenant].coalesced += future.waiters
+        future.set_result(model)
+        return model
+
+    def _load(self, tenant, path):
+        if not os.path.isfile(path):
+            raise UnknownTenant(f"no model for tenant {tenant!r}")
+        start = time.perf_counter()
+        model = TenantModel(tenant, path, joblib.load(path))
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            stats = self._stats.setdefault(tenant, TenantStats())
+            stats.loads += 1
+            stats.load.add(elapsed)
+            old = self._models.pop(tenant, None)
+            if old is not None:
+                self.resident_bytes -= old.bytes
+            self._models[tenant] = model
+            self.resident_bytes += model.bytes
+            # The tenant just loaded stays even if it alone exceeds the budget
+            while self.resident_bytes > self.max_bytes and len(self._models) > 1:
+                _, evicted = self._models.popitem(last=False)
+                self.resident_bytes -= evicted.bytes
+                self._stats[evicted.tenant].evictions += 1
+        return model
+
+    def score(self, model, row):
+        """(probability, {head: probability}) from a TenantModel returned by `get`, timed per tenant."""
+        start = time.perf_counter()
+        _, prob, heads = model.router.score(row)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stats[model.tenant].score.add(elapsed)
+        return prob, heads
+
+    def stats(self):
+        with self._lock:
+            tenants = {}
+            for tenant, stats in self._stats.items():
+                model = self._models.get(tenant)
+                tenants[tenant] = dict(stats.summary(), loaded=model is not None,
+                                       bytes=model.bytes if model else None,
+                                       model_version=model.bundle.get('model_version') if model else None)
+            return {
+                'loaded': len(self._models),
+                'resident_bytes': self.resident_bytes,
+                'max_bytes': self.max_bytes,
+                'tenants': tenants,
+            }
@@ -0,0 +1,103 @@
+import contextvars
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+_trace = contextvars.ContextVar('trace', default=None)
+_span = contextvars.ContextVar('span', default=None)
+
+
+class JsonlSink:
+    """Appends finished traces to a JSON-lines file from a background thread."""
+
+    def __init__(self, path, queue_size=10000):
+        self.path = path
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        threading.Thread(target=self._writer, name='trace-writer', daemon=True).start()
+
+    def write(self, record):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _writer(self):
+        while True:
+            records = [self._queue.get()]
+            while True:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            with open(self.path, 'a') as f:
+                for record in records:
+                    f.write(json.dumps(record, default=str) + '\n')
+
+
+class Tracer:
+    """Per-request span collection propagated through contextvars.
+
+    Spans are always collected (a couple of perf_counter calls each); whether a
+    finished trace is written is decided at the end, keeping a `sample_rate`
+    share of requests plus every request slower than `slow_ms`, so latency
+    spikes are always captured.
+    """
+
+    def __init__(self, sink, sample_rate=0.01, slow_ms=500.0):
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    def start(self, name, **attrs):
+        trace = {
+            'trace_id': uuid.uuid4().hex,
+            'name': name,
+            'ts': time.time(),
+            'start': time.perf_counter(),
+            'attrs': attrs,
+            'spans': [],
+        }
+        return _trace.set(trace), _span.set(None)
+
+    def finish(self, tokens, **attrs):
+        trace = _trace.get()
+        _trace.reset(tokens[0])
+        _span.reset(tokens[1])
+        if trace is None:
+            return
+        duration_ms = (time.perf_counter() - trace.pop('start')) * 1000.0
+        if duration_ms < self.slow_ms and random.random() >= self.sample_rate:
+            return
+        trace['duration_ms'] = round(duration_ms, 3)
+        trace['attrs'].update(attrs)
+        self.sink.write(trace)
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a block as a child of the current span; a no-op outside a trace."""
+    trace = _trace.get()
+    if trace is None:
+        yield
+        return
+    parent = _span.get()
+    record = {'name': name, 'parent': parent['name'] if parent else None}
+    if attrs:
+        record['attrs'] = attrs
+    token = _span.set(record)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        _span.reset(token)
+        record['offset_ms'] = round((start - trace['start']) * 1000.0, 3)
+        record['duration_ms'] = round((end - start) * 1000.0, 3)
+        trace['spans'].append(record)
@@ -1,16 +1,36 @@
-import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder
+from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder
 from sklearn.linear_model import LogisticRegression
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.pipeline import Pipeline
-from sklearn.metrics import accuracy_score
+from sklearn.metrics import accuracy_score, roc_auc_score
 from sklearn.impute import SimpleImputer
+from concurrent.futures import ThreadPoolExecutor
+import argparse
 import joblib
 import os
+import tempfile
+import time
 
-print("🚀 Starting model training...")
+import synthetic
+import data_source
+from stage_cache import StageCache, StageResult, code_version, fingerprint
+from llm_validation import BackgroundValidation, get_backend
+import evaluation
+from evaluation import bootstrap_metrics, format_report
+from drift import build_reference
+import data_profile
+from data_profile import profile_frame
+from multihead import HEAD_LABELS, MultiHeadScorer, fit_heads
+import percentiles as percentiles_module
+import population
+from percentiles import build_percentile_tables
+from schema import PLAUSIBLE_RANGES, build_schema
+import streaming_prep
+import hashing_encoder
+from hashing_encoder import HashingEncoder
 
 # Define feature spaces
 categorical_features = [
@@ -38,199 +58,369 @@ numeric_features = [
     'sugar',
 ]
 
-# Create larger, more realistic dataset with correlated features
-np.random.seed(42)
-N = 5000
-
-age = np.random.randint(18, 80, N)
-gender = np.random.choice(['Male', 'Female', 'Other'], N, p=[0.48, 0.50, 0.02])
-
-# Age affects body type probability slightly
-body_type = np.where(
-    age > 50,
-    np.random.choice(['Slim', 'Average', 'Overweight'], N, p=[0.15, 0.45, 0.40]),
-    np.random.choice(['Slim', 'Average', 'Overweight'], N, p=[0.30, 0.55, 0.15])
-)
-
-diet_type = np.random.choice(['Vegetarian', 'Mixed', 'Fast-food lover'], N, p=[0.3, 0.45, 0.25])
-
-# Physical activity linked with body type
-physical_activity = np.where(
-    body_type == 'Overweight',
-    np.random.choice(['Rarely', 'Sometimes', 'Regularly'], N, p=[0.45, 0.45, 0.10]),
-    np.random.choice(['Rarely', 'Sometimes', 'Regularly'], N, p=[0.20, 0.55, 0.25])
-)
-
-# Smoking/alcohol influence sleep
-smoking = np.random.choice(['Yes', 'No'], N, p=[0.18, 0.82])
-alcohol = np.random.choice(['Yes', 'No'], N, p=[0.30, 0.70])
-
-sleep_hours = np.clip(
-    np.random.normal(7 - (smoking == 'Yes') * 0.8 - (alcohol == 'Yes') * 0.5, 1.1, N),
-    3.5, 10.0
-)
-
-family_history = np.where(
-    age > 50,
-    np.random.choice(['None', 'Diabetes', 'Heart Issues'], N, p=[0.45, 0.35, 0.20]),
-    np.random.choice(['None', 'Diabetes', 'Heart Issues'], N, p=[0.60, 0.25, 0.15])
-)
-
-stress_level = np.random.choice(['Low', 'Medium', 'High'], N, p=[0.35, 0.45, 0.20])
-
-# Correlated with diet and stress
-water_intake_liters = np.clip(
-    np.random.normal(2.8 - (stress_level == 'High') * 0.6 - (diet_type == 'Fast-food lover') * 0.5, 0.8, N),
-    0.8, 5.5
-)
-
-junk_food_freq = np.where(
-    diet_type == 'Fast-food lover',
-    np.random.choice(['Rarely', 'Weekly', 'Daily'], N, p=[0.15, 0.40, 0.45]),
-    np.random.choice(['Rarely', 'Weekly', 'Daily'], N, p=[0.55, 0.35, 0.10])
-)
-
-# Height (m) and Weight (kg) to derive BMI
-height_m = np.clip(np.random.normal(1.65, 0.1, N), 1.45, 2.05)
-weight_kg = np.clip(
-    np.random.normal(65, 12, N)
-    + (diet_type == 'Fast-food lover') * 5
-    - (physical_activity == 'Regularly') * 3,
-    40, 160
-)
-bmi = np.round(weight_kg / (height_m ** 2), 1)
-
-# Clinical labs (simulate fasting glucose mg/dL and an additional sugar marker e.g., random glucose)
-glucose = np.clip(
-    np.random.normal(95 + (age > 45) * 10 + (family_history == 'Diabetes') * 15, 15, N),
-    60, 220
-)
-systolic_bp = np.clip(
-    np.random.normal(120 + (age > 50) * 15 + (bmi > 28) * 10, 12, N),
-    90, 200
-)
-diastolic_bp = np.clip(
-    np.random.normal(80 + (bmi > 28) * 5, 8, N),
-    55, 120
-)
-Sugar_random = np.clip(
-    np.random.normal(110 + (diet_type == 'Fast-food lover') * 10 + (stress_level == 'High') * 8, 20, N),
-    70, 260
-)
-
-data = pd.DataFrame({
-    'age': age,
-    'gender': gender,
-    'body_type': body_type,
-    'diet_type': diet_type,
-    'physical_activity': physical_activity,
-    'sleep_hours': np.round(sleep_hours, 1),
-    'smoking': smoking,
-    'alcohol': alcohol,
-    'family_history': family_history,
-    'stress_level': stress_level,
-    'water_intake_liters': np.round(water_intake_liters, 1),
-    'junk_food_freq': junk_food_freq,
-    'bmi': np.round(bmi, 1),
-    'height_cm': np.round(height_m * 100.0, 1),
-    'weight_kg': np.round(weight_kg, 1),
-    'glucose': np.round(glucose, 1),
-    'systolic_bp': np.round(systolic_bp, 1),
-    'diastolic_bp': np.round(diastolic_bp, 1),
-    'sugar': np.round(Sugar_random, 1),
-})
-
-# Generate synthetic risk score with realistic influence
-risk_score = (
-    (age > 55).astype(int) * 0.8 +
-    (body_type == 'Overweight').astype(int) * 0.9 +
-    (bmi > 27).astype(int) * 0.7 +
-    (diet_type == 'Fast-food lover').astype(int) * 0.8 +
-    (physical_activity == 'Rarely').astype(int) * 0.9 +
-    (sleep_hours < 6).astype(int) * 0.6 +
-    (smoking == 'Yes').astype(int) * 0.9 +
-    (alcohol == 'Yes').astype(int) * 0.4 +
-    (family_history != 'None').astype(int) * 0.8 +
-    (stress_level == 'High').astype(int) * 0.7 +
-    (water_intake_liters < 2).astype(int) * 0.5 +
-    (junk_food_freq == 'Daily').astype(int) * 0.7 +
-    (glucose > 130).astype(int) * 1.0 +
-    (systolic_bp > 140).astype(int) * 0.7 +
-    (diastolic_bp > 90).astype(int) * 0.6 +
-    (data['sugar'] > 160).astype(int) * 0.6
-)
-
-# Convert score to probability and then binary label
-noise = np.random.normal(0, 0.3, N)
-prob = 1 / (1 + np.exp(-(risk_score + noise - 1.6)))
-risk = (np.random.rand(N) < prob).astype(int)
-
-data['risk'] = risk
-
-print(f"✅ Dataset generated with {len(data)} samples and realistic lifestyle correlations.")
-
-# Optional: basic sanity stats
-print("Feature snapshot:")
-print(data.head(3))
-
-# Optional OpenAI validation (runs only if SDK/key available)
-try:
-    from openai import OpenAI as _OpenAI
-    _api_key = os.environ.get('OPENAI_API_KEY')
-    if _api_key:
-        client = _OpenAI(api_key=_api_key)
-        # Summarize distributions briefly to keep prompt small
-        desc = data.describe(include='all').to_string()[:4000]
-        prompt = (
-            "You are a data QA assistant. Given summary stats of a synthetic health-risk dataset, "
-            "check if feature distributions and correlations look plausible (not exact science). "
-            "Only flag obviously unrealistic patterns. Reply in one short paragraph.\n\n" + desc
-        )
-        try:
-            _resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a terse data QA assistant."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.0,
-                max_tokens=180,
-            )
-            _msg = _resp.choices[0].message.content if _resp and _resp.choices else "(no validation response)"
-            print("🔎 OpenAI validation:", _msg)
-        except Exception as _e:
-            print("(OpenAI validation skipped:", str(_e), ")")
-except Exception:
-    pass
-
-X = data[categorical_features + numeric_features]
-y = data['risk']
-
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-
-preprocessor = ColumnTransformer(
-    transformers=[
+MODEL_CONFIGS = {
+    'logistic': {'type': 'logistic', 'C': 1.0, 'max_iter': 1000},
+    'hgb': {'type': 'hgb', 'learning_rate': 0.03, 'max_iter': 200, 'max_leaf_nodes': 4,
+            'min_samples_leaf': 50, 'l2_regularization': 1.0, 'random_state': 42},
+}
+
+DEFAULT_CONFIG = {
+    'n': 5000,
+    'reference_n': 200000,
+    'seed': 42,
+    'test_size': 0.2,
+    'n_boot': 2000,
+    'prep': 'exact',
+    # categorical feature -> hashed width, for high-cardinality inputs (logistic only)
+    'hashed': {},
+    'model': MODEL_CONFIGS['logistic'],
+}
+
+MODEL_PATH = 'model/model.pkl'
+
+
+# ---------------------------------------------------------------------------
+# Stages: generate (or load --data) -> profile -> validate -> split -> fit -> percentiles -> evaluate -> heads -> publish
+# ---------------------------------------------------------------------------
+
+def generate_data(n, seed):
+    # Create larger, more realistic dataset with correlated features
+    return synthetic.generate(n, np.random.RandomState(seed))
+
+
+def generate_stage(cache, n, seed):
+    # Shared with compare_models.py; keyed on the whole synthetic module so parameter edits invalidate it
+    return cache.run('generate', generate_data, params={'n': n, 'seed': seed},
+                     code=code_version(generate_data, synthetic))
+
+
+def load_data(path):
+    """External records through the columnar cache, as a stage result the downstream stages can use.
+
+    The conversion has its own cache keyed by the source file, so the frame is
+    not copied into the stage cache; its key stands in for the artifact hash.
+    """
+    start = time.perf_counter()
+    dataset = data_source.open_dataset(path, categorical_features, numeric_features, optional=HEAD_LABELS)
+    key = fingerprint([dataset.key, code_version(data_source)])
+    return StageResult('load', key, key, dataset.to_frame(), not dataset.converted, time.perf_counter() - start)
+
+
+def profile_data(data):
+    return profile_frame(data)
+
+
+def validate_data(data, profile):
+    expected = categorical_features + numeric_features + ['risk']
+    missing = [c for c in expected if c not in profile['columns']]
+    if missing:
+        raise ValueError(f"Dataset is missing columns: {missing}")
+
+    # Null counts and the label rate come from the profile instead of another pass over the data
+    columns = profile['columns']
+    report = {
+        'rows': profile['rows'],
+        'null_counts': {c: columns[c]['missing'] for c in expected if columns[c]['missing']},
+        'risk_rate': columns['risk']['mean'],
+        'snapshot': data.head(3).to_string(),
+    }
+
+    return report
+
+
+def split_data(data, test_size, seed):
+    X = data[categorical_features + numeric_features]
+    y = data['risk']
+    return train_test_split(X, y, test_size=test_size, random_state=seed, stratify=y)
+
+
+def build_preprocessor(hashed=None, categorical=categorical_features, numeric=numeric_features):
+    # Features in `hashed` get a fixed-width HashingEncoder each instead of the one-hot vocabulary
+    hashed = hashed or {}
+    transformers = [
         ('cat', Pipeline(steps=[
             ('impute', SimpleImputer(strategy='most_frequent')),
             ('ohe', OneHotEncoder(handle_unknown='ignore')),
-        ]), categorical_features),
-        ('num', Pipeline(steps=[
-            ('impute', SimpleImputer(strategy='median')),
-        ]), numeric_features),
+        ]), [f for f in categorical if f not in hashed]),
     ]
-)
+    transformers += [(f'hash_{f}', HashingEncoder(n_features=width), [f]) for f, width in hashed.items()]
+    transformers.append(('num', Pipeline(steps=[
+        ('impute', SimpleImputer(strategy='median')),
+    ]), numeric))
+    return ColumnTransformer(transformers=transformers)
+
+
+def build_ordinal_preprocessor():
+    # Categories become integer codes consumed natively by the tree model; unknown or
+    # missing values map to -1, which HistGradientBoosting treats as missing.
+    return ColumnTransformer(
+        transformers=[
+            ('cat', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1,
+                                   encoded_missing_value=-1), categorical_features),
+            ('num', 'passthrough', numeric_features),
+        ]
+    )
+
+
+def build_pipeline(model, hashed=None):
+    if model['type'] == 'hgb':
+        if hashed:
+            raise ValueError('hashed features need the logistic model (HistGradientBoosting takes dense input)')
+        params = {k: v for k, v in model.items() if k != 'type'}
+        is_categorical = [True] * len(categorical_features) + [False] * len(numeric_features)
+        return Pipeline(steps=[
+            ('prep', build_ordinal_preprocessor()),
+            ('model', HistGradientBoostingClassifier(categorical_features=is_categorical, **params)),
+        ])
+    return Pipeline(steps=[
+        ('prep', build_preprocessor(hashed)),
+        ('model', LogisticRegression(C=model['C'], max_iter=model['max_iter']))
+    ])
+
+
+def fit_model(split, model, prep='exact', hashed=None):
+    X_train, _, y_train, _ = split
+    clf = build_pipeline(model, hashed)
+    if prep == 'streaming':
+        # Imputer medians/modes and encoder vocabularies from chunk sketches instead of whole columns
+        return streaming_prep.fit_pipeline(clf, X_train, y_train, categorical_features, numeric_features)
+    clf.fit(X_train, y_train)
+    return clf
+
+
+def evaluate_model(clf, split, n_boot, seed):
+    _, X_test, _, y_test = split
+    pred = clf.predict(X_test)
+    prob = clf.predict_proba(X_test)[:, 1]
+    return {
+        'accuracy': float(accuracy_score(y_test, pred)),
+        'bootstrap': bootstrap_metrics(y_test.to_numpy(), prob, n_boot=n_boot, seed=seed),
+    }
+
+
+def fit_head_models(data, split, clf, model):
+    # Head labels are looked up by index so the split artifact keeps its shape
+    X_train = split[0]
+    params = model if model['type'] == 'logistic' else MODEL_CONFIGS['logistic']
+    return fit_heads(clf, X_train, data.loc[X_train.index, HEAD_LABELS], build_preprocessor,
+                     C=params['C'], max_iter=params['max_iter'])
+
+
+def evaluate_heads(heads, data, split):
+    X_test = split[1]
+    probs = MultiHeadScorer(heads).predict_proba(X_test)
+    labels = data.loc[X_test.index]
+    return {name: float(roc_auc_score(labels[name], probs[:, i])) for i, name in enumerate(heads['names'])}
+
+
+def build_percentiles(clf, n, seed):
+    # A simulated population larger than the training set keeps the small cohorts populated
+    population = synthetic.generate(n, np.random.RandomState(seed))
+    prob = clf.predict_proba(population[categorical_features + numeric_features])[:, 1]
+    return {'risk_percentiles': build_percentile_tables(population, prob)}
+
+
+def build_data_percentiles(data, clf):
+    # With real records the loaded dataset itself is the reference population
+    prob = clf.predict_proba(data[categorical_features + numeric_features])[:, 1]
+    return {'risk_percentiles': build_percentile_tables(data, prob)}
+
+
+def build_references(split):
+    X_train = split[0]
+    return {'drift_reference': build_reference(X_train, categorical_features, numeric_features)}
+
+
+def data_schema(data, profile, hashed):
+    # External records bring their own vocabulary; the plausible ranges are widened to cover every record
+    categories = {c: sorted(str(v) for v in data[c].astype('category').cat.categories) for c in categorical_features}
+    columns = profile['columns']
+    bounds = dict(PLAUSIBLE_RANGES)
+    for c in numeric_features:
+        if columns[c].get('count'):
+            lo, hi = bounds.get(c, (columns[c]['min'], columns[c]['max']))
+            bounds[c] = (float(min(lo, columns[c]['min'])), float(max(hi, columns[c]['max'])))
+    return build_schema(categorical_features, numeric_features, categories=categories, bounds=bounds, hashed=hashed)
+
+
+def publish_bundle(clf, model_version, sources, extras, path=MODEL_PATH):
+    # `sources` are the artifact hashes of every stage that feeds the bundle
+    bundle_key = fingerprint(sources)
+    version_path = path + '.version'
+    if os.path.exists(path) and os.path.exists(version_path):
+        with open(version_path) as f:
+            if f.read().strip() == bundle_key:
+                return False
+
+    bundle = {
+        'pipeline': clf,
+        'categorical_features': categorical_features,
+        'numeric_features': numeric_features,
+        'model_version': model_version,
+    }
+    bundle.update(extras)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write-then-rename so a serving process never reads a half-written bundle
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    joblib.dump(bundle, tmp)
+    os.replace(tmp, path)
+    with open(version_path, 'w') as f:
+        f.write(bundle_key)
+    return True
+
+
+def run(config, cache):
+    def log(result):
+        status = 'cached' if result.cached else 'ran'
+        print(f"  [{result.name}] {status} in {result.seconds:.2f}s ({result.artifact_hash[:12]})")
+
+    if config.get('data'):
+        generated = load_data(config['data'])
+        log(generated)
+        print(f"📂 Loaded {len(generated.value)} records from '{config['data']}'.")
+    else:
+        generated = generate_stage(cache, config['n'], config['seed'])
+        log(generated)
+        print(f"✅ Dataset generated with {len(generated.value)} samples and realistic lifestyle correlations.")
+
+    # profile and split only depend on the generated data, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        profiled_f = pool.submit(cache.run, 'profile', profile_data, upstream=[generated],
+                                 code=code_version(profile_data, data_profile))
+        split_f = pool.submit(cache.run, 'split', split_data,
+                              params={'test_size': config['test_size'], 'seed': config['seed']},
+                              upstream=[generated])
+        profiled = profiled_f.result()
+
+        # Optional LLM validation runs alongside fitting and never blocks it
+        backend = get_backend(config.get('llm_backend'))
+        qa = BackgroundValidation(profiled.value, backend) if backend else None
+
+        validated = cache.run('validate', validate_data, upstream=[generated, profiled])
+        split = split_f.result()
+    log(profiled)
+    log(validated)
+    log(split)
+
+    # Optional: basic sanity stats
+    print("Feature snapshot:")
+    print(validated.value['snapshot'])
+
+    # The serving reference sketches only need the training split, so build them while fitting
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        fitted_f = pool.submit(cache.run, 'fit', fit_model,
+                               params={'model': config['model'], 'prep': config['prep'],
+                                       'hashed': config['hashed']},
+                               upstream=[split],
+                               code=code_version(fit_model, build_pipeline, build_preprocessor,
+                                                 build_ordinal_preprocessor, streaming_prep, data_profile,
+                                                 hashing_encoder))
+        reference_f = pool.submit(cache.run, 'reference', build_references, upstream=[split],
+                                  code=code_version(build_references, build_reference))
+        fitted, reference = fitted_f.result(), reference_f.result()
+    log(fitted)
+    log(reference)
+
+    if config.get('data'):
+        percentiles = cache.run('percentiles', build_data_percentiles, upstream=[generated, fitted],
+                                code=code_version(build_data_percentiles, percentiles_module, population))
+    else:
+        percentiles = cache.run('percentiles', build_percentiles,
+                                params={'n': config['reference_n'], 'seed': config['seed'] + 1},
+                                upstream=[fitted],
+                                code=code_version(build_percentiles, percentiles_module, population, synthetic))
+    log(percentiles)
+
+    evaluated = cache.run('evaluate', evaluate_model,
+                          params={'n_boot': config['n_boot'], 'seed': config['seed']},
+                          upstream=[fitted, split],
+                          code=code_version(evaluate_model, evaluation))
+    log(evaluated)
+    metrics = evaluated.value
+    print(f"🎯 Model trained successfully with accuracy: {metrics['accuracy']*100:.2f}%")
+    print(format_report(metrics['bootstrap']))
+
+    if all(label in generated.value.columns for label in HEAD_LABELS):
+        heads = cache.run('heads', fit_head_models, params={'model': config['model']},
+                          upstream=[generated, split, fitted],
+                          code=code_version(fit_head_models, fit_heads, build_preprocessor))
+        log(heads)
+        metrics = dict(metrics, head_auc=evaluate_heads(heads.value, generated.value, split.value))
+        print("🧩 Risk heads (test AUC): " + ', '.join(f"{k}={v:.3f}" for k, v in metrics['head_auc'].items()))
+        head_sources, head_extras = [heads.artifact_hash], {'heads': heads.value}
+    else:
+        head_sources, head_extras = [], {}
+
+    if config.get('data'):
+        schema = data_schema(generated.value, profiled.value, config['hashed'])
+    else:
+        schema = build_schema(categorical_features, numeric_features, hashed=config['hashed'])
+    published = publish_bundle(
+        fitted.value,
+        model_version=fitted.artifact_hash[:16],
+        sources=[fitted.artifact_hash, evaluated.artifact_hash, reference.artifact_hash,
+                 profiled.artifact_hash, percentiles.artifact_hash, fingerprint(schema)] + head_sources,
+        extras=dict(reference.value, metrics=metrics, reference_profile=profiled.value, schema=schema,
+                    **percentiles.value, **head_extras),
+    )
+    if published:
+        print(f"💾 Model saved as '{MODEL_PATH}'")
+    else:
+        print(f"💾 '{MODEL_PATH}' already up to date")
+
+    if qa is not None:
+        report_validation(qa)
+
+
+def report_validation(qa):
+    # Training never waits on the LLM; the detached request caches a late verdict for the next run
+    if not qa.done():
+        print("(LLM validation still running in the background; the next run reports its cached verdict)")
+    elif qa.error:
+        print("(LLM validation skipped:", qa.error, ")")
+    else:
+        print("🔎 LLM validation" + (" (cached)" if qa.cached else "") + ":", qa.verdict)
+
 
-clf = Pipeline(steps=[
-    ('prep', preprocessor),
-    ('model', LogisticRegression(max_iter=1000))
-])
+def parse_args():
+    parser = argparse.ArgumentParser(description='Train the health risk model.')
+    parser.add_argument('--n', type=int, default=DEFAULT_CONFIG['n'], help='number of synthetic samples')
+    parser.add_argument('--data', default=None,
+                        help='train on records from a CSV/Parquet file instead of synthetic data')
+    parser.add_argument('--seed', type=int, default=DEFAULT_CONFIG['seed'])
+    parser.add_argument('--reference-n', type=int, default=DEFAULT_CONFIG['reference_n'],
+                        help='simulated population size for the risk percentile tables')
+    parser.add_argument('--model', choices=sorted(MODEL_CONFIGS), default=DEFAULT_CONFIG['model']['type'])
+    parser.add_argument('--C', type=float, default=None, help='inverse regularisation strength (logistic only)')
+    parser.add_argument('--prep', choices=['exact', 'streaming'], default=DEFAULT_CONFIG['prep'],
+                        help='fit imputers/encoders on whole columns or from bounded-memory chunk sketches')
+    parser.add_argument('--hash', action='append', default=[], metavar='FEATURE[=WIDTH]',
+                        help='hash a categorical feature into WIDTH buckets (default 256) instead of one-hot')
+    parser.add_argument('--n-boot', type=int, default=DEFAULT_CONFIG['n_boot'], help='bootstrap resamples for evaluation')
+    parser.add_argument('--no-cache', action='store_true', help='re-run every stage')
+    parser.add_argument('--llm-backend', choices=['openai', 'fake', 'off'], default=None,
+                        help='dataset QA backend (default: $LLM_VALIDATION_BACKEND or openai)')
+    return parser.parse_args()
 
-clf.fit(X_train, y_train)
 
-pred = clf.predict(X_test)
-acc = accuracy_score(y_test, pred)
-print(f"🎯 Model trained successfully with accuracy: {acc*100:.2f}%")
+if __name__ == '__main__':
+    args = parse_args()
+    config = dict(DEFAULT_CONFIG, n=args.n, seed=args.seed, n_boot=args.n_boot, reference_n=args.reference_n)
+    config['model'] = dict(MODEL_CONFIGS[args.model])
+    if args.C is not None and args.model == 'logistic':
+        config['model']['C'] = args.C
+    config['llm_backend'] = args.llm_backend
+    config['data'] = args.data
+    config['prep'] = args.prep
+    config['hashed'] = {}
+    for spec in args.hash:
+        name, _, width = spec.partition('=')
+        if name not in categorical_features:
+            raise SystemExit(f"--hash {spec}: {name!r} is not a categorical feature")
+        config['hashed'][name] = int(width or 256)
+    if config['hashed'] and args.model != 'logistic':
+        raise SystemExit('--hash needs --model logistic')
 
-os.makedirs('model', exist_ok=True)
-joblib.dump({'pipeline': clf, 'categorical_features': categorical_features, 'numeric_features': numeric_features}, 'model/model.pkl')
-print("💾 Model saved as 'model/model.pkl'")
\ No newline at end of file
+    print("🚀 Starting model training...")
+    run(config, StageCache(enabled=not args.no_cache))
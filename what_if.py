@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+MAX_VARIANTS = 20000
+MAX_AXIS_VALUES = 500
+
+
+def expand_values(field, spec):
+    """Alternative values for one field: a list, or a {start, stop, step} numeric range (inclusive)."""
+    if isinstance(spec, dict):
+        try:
+            start, stop, step = float(spec['start']), float(spec['stop']), float(spec.get('step', 1))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"vary.{field} range needs numeric start, stop and step")
+        if step <= 0 or stop < start:
+            raise ValueError(f"vary.{field} range must have step > 0 and stop >= start")
+        count = int(np.floor((stop - start) / step + 1e-9)) + 1
+        if count > MAX_AXIS_VALUES:
+            raise ValueError(f"vary.{field} expands to {count} values (max {MAX_AXIS_VALUES})")
+        values = np.round(start + step * np.arange(count), 6).tolist()
+    elif isinstance(spec, (list, tuple)):
+        values = list(spec)
+    else:
+        raise ValueError(f"vary.{field} must be a list of values or a {{start, stop, step}} range")
+    if not values:
+        raise ValueError(f"vary.{field} has no values")
+    return values
+
+
+def build_grid(base, vary, categorical_features, numeric_features, validator=None):
+    """Cartesian grid of profile variants as one DataFrame.
+
+    Row 0 is the unmodified base profile; rows 1.. enumerate the grid in C order of
+    `vary`, so the scores reshape to one axis per varied field. `bmi` is recomputed
+    whenever height or weight varies. With a schema `validator`, every axis value
+    must be one a request row could hold.
+    """
+    if not isinstance(vary, dict):
+        raise ValueError('vary must be an object mapping fields to values')
+    columns = categorical_features + numeric_features
+    axes = []
+    for field, spec in vary.items():
+        if field not in columns:
+            raise ValueError(f"unknown field in vary: {field}")
+        if field == 'bmi':
+            raise ValueError("bmi is derived; vary height_cm or weight_kg instead")
+        values = expand_values(field, spec)
+        if field in numeric_features:
+            try:
+                values = [float(v) for v in values]
+            except (TypeError, ValueError):
+                raise ValueError(f"vary.{field} values must be numeric")
+        if validator is not None:
+            values = validator.check_values(field, values)
+        axes.append((field, values))
+    if not axes:
+        raise ValueError('vary must name at least one field')
+
+    shape = [len(values) for _, values in axes]
+    total = int(np.prod(shape))
+    if total > MAX_VARIANTS:
+        raise ValueError(f"grid has {total} variants (max {MAX_VARIANTS})")
+
+    data = {}
+    for c in categorical_features:
+        data[c] = np.full(total + 1, base.get(c), dtype=object)
+    for c in numeric_features:
+        v = base.get(c)
+        data[c] = np.full(total + 1, np.nan if v is None else v, dtype=float)
+
+    # Grid coordinates for every variant, then one fancy-index per axis
+    index = np.indices(shape).reshape(len(shape), -1)
+    for k, (field, values) in enumerate(axes):
+        data[field][1:] = np.asarray(values, dtype=data[field].dtype)[index[k]]
+
+    varied = {field for field, _ in axes}
+    if 'bmi' in data and varied & {'height_cm', 'weight_kg'}:
+        h_m = data['height_cm'] / 100.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            data['bmi'] = np.where(h_m > 0, np.round(data['weight_kg'] / (h_m * h_m), 1), np.nan)
+
+    return pd.DataFrame(data, columns=columns), axes